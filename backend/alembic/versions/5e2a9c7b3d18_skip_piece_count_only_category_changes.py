@@ -0,0 +1,92 @@
+"""skip_piece_count_only_category_changes
+
+Revision ID: 5e2a9c7b3d18
+Revises: c6e4b8d2a915
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c7b3d18'
+down_revision: Union[str, None] = 'c6e4b8d2a915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Trigger arguments after the entity name are columns that don't reach sync clients. UPDATEs
+# only record the rows where another column changed: the piece_count trigger updates categories
+# on every piece insert, move and delete, which must not look like a category change too.
+RECORD_CHANGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_change() RETURNS trigger AS $$
+DECLARE
+    change_entity text := TG_ARGV[0];
+    unsynced_columns text[] := COALESCE(TG_ARGV[1:TG_NARGS - 1], '{}');
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'delete' FROM old_rows ORDER BY id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, n.id, 'upsert'
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE to_jsonb(n) - unsynced_columns IS DISTINCT FROM to_jsonb(o) - unsynced_columns
+        ORDER BY n.id;
+    ELSE
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'upsert' FROM new_rows ORDER BY id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# As created by c6e4b8d2a915
+PREVIOUS_RECORD_CHANGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_change() RETURNS trigger AS $$
+DECLARE
+    change_entity text := TG_ARGV[0];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'delete' FROM old_rows ORDER BY id;
+    ELSE
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'upsert' FROM new_rows ORDER BY id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+UPDATE_TRIGGERS = [
+    # (table, trigger arguments)
+    ('categories', "'category', 'piece_count'"),
+    ('pieces_of_art', "'piece'"),
+]
+
+
+def upgrade() -> None:
+    op.execute(RECORD_CHANGE_FUNCTION)
+    for table, arguments in UPDATE_TRIGGERS:
+        op.execute(f"DROP TRIGGER {table}_changes_update ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER {table}_changes_update AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_catalog_change({arguments})
+        """)
+
+
+def downgrade() -> None:
+    for table, arguments in UPDATE_TRIGGERS:
+        entity = arguments.split(",")[0]
+        op.execute(f"DROP TRIGGER {table}_changes_update ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER {table}_changes_update AFTER UPDATE ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_catalog_change({entity})
+        """)
+    op.execute(PREVIOUS_RECORD_CHANGE_FUNCTION)
@@ -0,0 +1,48 @@
+"""add_search_vector_to_pieces_of_art
+
+Revision ID: 7c2e9a41d5b3
+Revises: 04f57e8c7f80
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a41d5b3'
+down_revision: Union[str, None] = '04f57e8c7f80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated column (PostgreSQL 12+), kept up to date by the database on every insert/update
+    op.add_column('pieces_of_art', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_pieces_of_art_search_vector', 'pieces_of_art', ['search_vector'], unique=False, postgresql_using='gin')
+
+    # Trigram index for the ILIKE fallback used by short search queries
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_pieces_of_art_name_trgm', 'pieces_of_art', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pieces_of_art_name_trgm', table_name='pieces_of_art')
+    op.drop_index('ix_pieces_of_art_search_vector', table_name='pieces_of_art')
+    op.drop_column('pieces_of_art', 'search_vector')
+    # The pg_trgm extension is left installed; other objects may depend on it
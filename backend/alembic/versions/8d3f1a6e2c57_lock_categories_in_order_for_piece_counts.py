@@ -0,0 +1,98 @@
+"""lock_categories_in_order_for_piece_counts
+
+Revision ID: 8d3f1a6e2c57
+Revises: 5e2a9c7b3d18
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f1a6e2c57'
+down_revision: Union[str, None] = '5e2a9c7b3d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# UPDATE ... FROM locks the category rows in whatever order the join produces, so two statements
+# moving pieces between the same categories in opposite directions could deadlock. The affected
+# categories are now locked first, in id order (as crud.delete_category does); the UPDATE then
+# only touches rows already locked. FOR NO KEY UPDATE is the lock the UPDATE takes anyway, and
+# doesn't block the foreign key checks of concurrent piece inserts.
+MAINTAIN_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION pieces_of_art_maintain_piece_count() RETURNS trigger AS $$
+DECLARE
+    category_ids integer[];
+    deltas bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(category_id), array_agg(delta) INTO category_ids, deltas
+        FROM (SELECT category_id, count(*) AS delta FROM new_rows GROUP BY category_id) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(category_id), array_agg(delta) INTO category_ids, deltas
+        FROM (SELECT category_id, -count(*) AS delta FROM old_rows GROUP BY category_id) d;
+    ELSE
+        SELECT array_agg(category_id), array_agg(delta) INTO category_ids, deltas
+        FROM (
+            SELECT category_id, sum(delta) AS delta FROM (
+                SELECT category_id, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT category_id, -1 AS delta FROM old_rows
+            ) moved
+            GROUP BY category_id
+            HAVING sum(delta) <> 0
+        ) d;
+    END IF;
+    IF category_ids IS NULL THEN
+        RETURN NULL; -- No piece changed category
+    END IF;
+
+    PERFORM 1 FROM categories WHERE id = ANY(category_ids) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE categories c SET piece_count = c.piece_count + d.delta
+    FROM unnest(category_ids, deltas) AS d(category_id, delta)
+    WHERE c.id = d.category_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# As created by d41a7f2c9e08
+PREVIOUS_MAINTAIN_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION pieces_of_art_maintain_piece_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE categories c SET piece_count = c.piece_count + d.delta
+        FROM (SELECT category_id, count(*) AS delta FROM new_rows GROUP BY category_id) d
+        WHERE c.id = d.category_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE categories c SET piece_count = c.piece_count - d.delta
+        FROM (SELECT category_id, count(*) AS delta FROM old_rows GROUP BY category_id) d
+        WHERE c.id = d.category_id;
+    ELSE
+        UPDATE categories c SET piece_count = c.piece_count + d.delta
+        FROM (
+            SELECT category_id, sum(delta) AS delta FROM (
+                SELECT category_id, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT category_id, -1 AS delta FROM old_rows
+            ) moved
+            GROUP BY category_id
+            HAVING sum(delta) <> 0
+        ) d
+        WHERE c.id = d.category_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(MAINTAIN_COUNTS_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_MAINTAIN_COUNTS_FUNCTION)
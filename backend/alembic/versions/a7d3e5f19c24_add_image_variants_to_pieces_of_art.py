@@ -0,0 +1,28 @@
+"""add_image_variants_to_pieces_of_art
+
+Revision ID: a7d3e5f19c24
+Revises: f3c81d7a2b60
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f19c24'
+down_revision: Union[str, None] = 'f3c81d7a2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled in by the derivative workers; existing pieces can be backfilled with `python images.py`
+    op.add_column('pieces_of_art', sa.Column('image_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pieces_of_art', 'image_variants')
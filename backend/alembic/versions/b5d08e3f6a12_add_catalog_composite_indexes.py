@@ -0,0 +1,37 @@
+"""add_catalog_composite_indexes
+
+Revision ID: b5d08e3f6a12
+Revises: 7c2e9a41d5b3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d08e3f6a12'
+down_revision: Union[str, None] = '7c2e9a41d5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pieces_of_art.category_id had no index: category-filtered listings and the FK check
+    # on category deletion scanned the whole table
+    op.create_index('ix_pieces_of_art_category_id_id', 'pieces_of_art', ['category_id', 'id'], unique=False)
+    op.create_index('ix_pieces_of_art_category_id_created_at', 'pieces_of_art', ['category_id', 'created_at'], unique=False)
+
+    # Duplicates of the primary key indexes; they only cost write time and space
+    op.drop_index('ix_pieces_of_art_id', table_name='pieces_of_art')
+    op.drop_index('ix_managers_id', table_name='managers')
+    op.drop_index('ix_categories_id', table_name='categories')
+
+
+def downgrade() -> None:
+    op.create_index('ix_categories_id', 'categories', ['id'], unique=False)
+    op.create_index('ix_managers_id', 'managers', ['id'], unique=False)
+    op.create_index('ix_pieces_of_art_id', 'pieces_of_art', ['id'], unique=False)
+    op.drop_index('ix_pieces_of_art_category_id_created_at', table_name='pieces_of_art')
+    op.drop_index('ix_pieces_of_art_category_id_id', table_name='pieces_of_art')
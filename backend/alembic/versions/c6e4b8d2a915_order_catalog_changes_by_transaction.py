@@ -0,0 +1,68 @@
+"""order_catalog_changes_by_transaction
+
+Revision ID: c6e4b8d2a915
+Revises: a7d3e5f19c24
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e4b8d2a915'
+down_revision: Union[str, None] = 'a7d3e5f19c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The trigger no longer takes an advisory lock, so catalog writers don't wait for each other.
+# Each change records the id of the writing transaction instead (column default); the feed
+# orders by (txid, id) and only lists transactions older than the oldest one still running,
+# which have all committed (or rolled back) by then.
+RECORD_CHANGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_change() RETURNS trigger AS $$
+DECLARE
+    change_entity text := TG_ARGV[0];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'delete' FROM old_rows ORDER BY id;
+    ELSE
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'upsert' FROM new_rows ORDER BY id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_RECORD_CHANGE_FUNCTION = RECORD_CHANGE_FUNCTION.replace(
+    "BEGIN\n", "BEGIN\n    PERFORM pg_advisory_xact_lock(hashtext('catalog_changes'));\n", 1
+)
+
+
+def upgrade() -> None:
+    # Changes recorded so far get txid 0: they keep their id order, before any new change
+    op.add_column('catalog_changes', sa.Column('txid', sa.BigInteger(), server_default='0', nullable=False))
+    op.alter_column('catalog_changes', 'txid', server_default=sa.text('(pg_current_xact_id()::text::bigint)'))
+    op.create_index('ix_catalog_changes_txid_id', 'catalog_changes', ['txid', 'id'], unique=False)
+    op.execute(RECORD_CHANGE_FUNCTION)
+
+    # Feed position up to which changes were pruned (a single row, written by prune_changes.py)
+    op.create_table('catalog_changes_retention',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('pruned_txid', sa.BigInteger(), nullable=False),
+    sa.Column('pruned_id', sa.BigInteger(), nullable=False),
+    sa.Column('pruned_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_changes_retention')
+    op.execute(PREVIOUS_RECORD_CHANGE_FUNCTION)
+    op.drop_index('ix_catalog_changes_txid_id', table_name='catalog_changes')
+    op.drop_column('catalog_changes', 'txid')
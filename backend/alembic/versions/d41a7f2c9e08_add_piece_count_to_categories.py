@@ -0,0 +1,85 @@
+"""add_piece_count_to_categories
+
+Revision ID: d41a7f2c9e08
+Revises: b5d08e3f6a12
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7f2c9e08'
+down_revision: Union[str, None] = 'b5d08e3f6a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level trigger with transition tables: one UPDATE of categories per statement on
+# pieces_of_art (a batched import of 1000 rows adjusts each affected category once), and
+# updates that don't move pieces between categories don't touch categories at all.
+MAINTAIN_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION pieces_of_art_maintain_piece_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE categories c SET piece_count = c.piece_count + d.delta
+        FROM (SELECT category_id, count(*) AS delta FROM new_rows GROUP BY category_id) d
+        WHERE c.id = d.category_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE categories c SET piece_count = c.piece_count - d.delta
+        FROM (SELECT category_id, count(*) AS delta FROM old_rows GROUP BY category_id) d
+        WHERE c.id = d.category_id;
+    ELSE
+        UPDATE categories c SET piece_count = c.piece_count + d.delta
+        FROM (
+            SELECT category_id, sum(delta) AS delta FROM (
+                SELECT category_id, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT category_id, -1 AS delta FROM old_rows
+            ) moved
+            GROUP BY category_id
+            HAVING sum(delta) <> 0
+        ) d
+        WHERE c.id = d.category_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column('piece_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE categories c SET piece_count = counts.n
+        FROM (SELECT category_id, count(*) AS n FROM pieces_of_art GROUP BY category_id) counts
+        WHERE c.id = counts.category_id
+    """)
+
+    op.execute(MAINTAIN_COUNTS_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER pieces_of_art_piece_count_insert AFTER INSERT ON pieces_of_art
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pieces_of_art_maintain_piece_count()
+    """)
+    op.execute("""
+        CREATE TRIGGER pieces_of_art_piece_count_update AFTER UPDATE ON pieces_of_art
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pieces_of_art_maintain_piece_count()
+    """)
+    op.execute("""
+        CREATE TRIGGER pieces_of_art_piece_count_delete AFTER DELETE ON pieces_of_art
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pieces_of_art_maintain_piece_count()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS pieces_of_art_piece_count_delete ON pieces_of_art")
+    op.execute("DROP TRIGGER IF EXISTS pieces_of_art_piece_count_update ON pieces_of_art")
+    op.execute("DROP TRIGGER IF EXISTS pieces_of_art_piece_count_insert ON pieces_of_art")
+    op.execute("DROP FUNCTION IF EXISTS pieces_of_art_maintain_piece_count()")
+    op.drop_column('categories', 'piece_count')
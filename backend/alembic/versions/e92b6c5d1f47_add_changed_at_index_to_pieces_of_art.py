@@ -0,0 +1,30 @@
+"""add_changed_at_index_to_pieces_of_art
+
+Revision ID: e92b6c5d1f47
+Revises: d41a7f2c9e08
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e92b6c5d1f47'
+down_revision: Union[str, None] = 'd41a7f2c9e08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the incremental export filter: coalesce(updated_at, created_at) >= :since
+    op.create_index(
+        'ix_pieces_of_art_changed_at', 'pieces_of_art',
+        [sa.text('coalesce(updated_at, created_at)')], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pieces_of_art_changed_at', table_name='pieces_of_art')
@@ -0,0 +1,84 @@
+"""create_catalog_changes
+
+Revision ID: f3c81d7a2b60
+Revises: e92b6c5d1f47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c81d7a2b60'
+down_revision: Union[str, None] = 'e92b6c5d1f47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level trigger function shared by categories and pieces_of_art (TG_ARGV[0] is the
+# entity name). The transaction-scoped advisory lock serializes catalog writers until commit,
+# so change ids are handed out in commit order and a client cursor never skips a change that
+# commits late.
+RECORD_CHANGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_change() RETURNS trigger AS $$
+DECLARE
+    change_entity text := TG_ARGV[0];
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('catalog_changes'));
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'delete' FROM old_rows ORDER BY id;
+    ELSE
+        INSERT INTO catalog_changes (entity, entity_id, op)
+        SELECT change_entity, id, 'upsert' FROM new_rows ORDER BY id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = [
+    # (table, entity)
+    ('categories', 'category'),
+    ('pieces_of_art', 'piece'),
+]
+
+
+def upgrade() -> None:
+    op.create_table('catalog_changes',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute(RECORD_CHANGE_FUNCTION)
+    for table, entity in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {table}_changes_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_catalog_change('{entity}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_changes_update AFTER UPDATE ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_catalog_change('{entity}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_changes_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_catalog_change('{entity}')
+        """)
+
+
+def downgrade() -> None:
+    for table, _ in TRIGGERS:
+        for operation in ('delete', 'update', 'insert'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_changes_{operation} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS record_catalog_change()")
+    op.drop_table('catalog_changes')
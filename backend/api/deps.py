@@ -1,22 +1,44 @@
+import hashlib
+import secrets
+import time
 from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from pydantic import EmailStr # For type hinting email in TokenData
 
+from core.cache import manager_cache
 from core.config import settings
 import crud
 import models
 import schemas
-from database import get_db # Corrected: get_db is the dependency
+from database import get_db, run_db # Corrected: get_db is the dependency
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/auth/login" # Ensure this matches your auth router's login path
 )
 
-def get_current_manager(db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)) -> models.Manager:
+# Manager columns kept in the token cache (never the password hash)
+_CACHED_MANAGER_FIELDS = ("id", "email", "first_name", "last_name", "created_at", "updated_at")
+
+def _token_cache_key(token: str) -> str:
+    # Key on a digest so raw bearer tokens are not kept in memory
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def get_current_manager(db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)) -> models.Manager:
+    """
+    Resolves the bearer token to a manager.
+    A token that was already verified and is not expired is served from manager_cache, which
+    skips the JWT decode and the manager SELECT; the cached manager is returned as a transient
+    (session-less) models.Manager without the password hash.
+    """
+    token_key = _token_cache_key(token)
+    cached = manager_cache.get(token_key)
+    if cached is not None and (cached["exp"] is None or cached["exp"] > time.time()):
+        return models.Manager(**cached["manager"])
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,11 +65,32 @@ def get_current_manager(db: Session = Depends(get_db), token: str = Depends(reus
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    manager = crud.get_manager_by_email(db, email=token_data.email)
+    manager = await run_db(db, crud.get_manager_by_email, email=token_data.email)
     if manager is None:
         raise credentials_exception # Manager not found in DB
+    manager_cache.set(token_key, {
+        "exp": payload.get("exp"),
+        "manager": {field: getattr(manager, field) for field in _CACHED_MANAGER_FIELDS},
+    })
     return manager
 
+metrics_bearer = HTTPBearer(auto_error=False)
+
+async def require_metrics_access(
+    db: Session = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_bearer)
+) -> None:
+    """/api/metrics accepts the METRICS_TOKEN bearer token (for the scraper) or a manager's access token."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token = credentials.credentials
+    if settings.METRICS_TOKEN and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    await get_current_manager(db=db, token=token)
+
 # Example of a dependency for a superuser, if you implement roles:
 # def get_current_active_superuser(
 #     current_manager: models.Manager = Depends(get_current_manager),
@@ -9,21 +9,31 @@ import schemas
 import security # Renamed from auth to security to avoid module name conflict
 from api import deps # For get_db dependency if not directly imported
 from core.config import settings
-from database import get_db # Direct import for get_db
+from database import get_db, run_db # Direct import for get_db
 
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     Username is the manager's email.
+    The bcrypt check runs on the dedicated password hashing pool rather than the request
+    threadpool; when that pool is saturated the login is rejected with 503.
     """
-    manager = crud.get_manager_by_email(db, email=form_data.username)
-    if not manager or not security.verify_password(form_data.password, manager.hashed_password):
+    manager = await run_db(db, crud.get_manager_by_email, email=form_data.username)
+    try:
+        password_ok = manager is not None and await security.verify_password_async(form_data.password, manager.hashed_password)
+    except security.PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,33 +1,69 @@
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 import crud
 import models
 import schemas
 from api import deps # For get_current_manager and get_db
-from database import get_db # Direct import for get_db
+from core import conditional, pagination
+from core.cache import CATEGORIES, cache_key, response_cache
+from database import get_db, run_db # Direct import for get_db
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Category])
-def read_categories(
+# CategoryWithCount when include_counts=true, plain Category otherwise
+@router.get("/", response_model=Union[List[schemas.CategoryWithCount], List[schemas.Category]])
+async def read_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None, # Opaque cursor from a previous page's X-Next-Cursor header
+    include_counts: bool = False, # Adds piece_count to each category
     # current_manager: models.Manager = Depends(deps.get_current_manager) # Uncomment if auth needed for listing
 ):
     """
     Retrieve all categories.
     Publicly accessible.
+    Supports skip/limit pagination, or cursor pagination with `after`;
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    Answers If-None-Match / If-Modified-Since with 304 without loading the page.
+    With include_counts, each category carries piece_count, read from the precomputed
+    categories.piece_count column (no aggregation over pieces_of_art).
     """
-    categories = crud.get_categories(db, skip=skip, limit=limit)
+    after_id = pagination.parse_after(after)
+    # Listings with counts are cached under their own prefix, which piece writes also invalidate
+    scope = ("list", "counts") if include_counts else ("list",)
+    schema = schemas.CategoryWithCount if include_counts else schemas.Category
+
+    stats = await response_cache.aget_or_set(
+        cache_key(CATEGORIES, *scope, "stats"),
+        lambda: run_db(db, crud.get_categories_stats, with_counts=include_counts),
+    )
+    validators = conditional.collection_validators(
+        CATEGORIES, *stats[:3], skip=skip, limit=limit, after=after_id, counts=stats[3] if include_counts else None
+    )
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+
+    def load(session: Session):
+        categories = crud.get_categories(session, skip=skip, limit=limit, after_id=after_id)
+        return [schema.model_validate(c) for c in categories], pagination.next_cursor(categories, limit)
+
+    key = cache_key(CATEGORIES, *scope, skip=skip, limit=limit, after=after_id)
+    categories, cursor = await response_cache.aget_or_set(key, lambda: run_db(db, load))
+    pagination.set_next_cursor_header(response, cursor)
+    conditional.set_validators(response, validators)
     return categories
 
 @router.get("/{category_id}", response_model=schemas.Category)
-def read_category(
+async def read_category(
     category_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     # current_manager: models.Manager = Depends(deps.get_current_manager) # Uncomment if auth needed
 ):
@@ -35,17 +71,25 @@ def read_category(
     Retrieve a specific category by ID.
     Publicly accessible.
     """
-    db_category = crud.get_category(db, category_id=category_id)
-    if db_category is None:
+    def load(session: Session):
+        db_category = crud.get_category(session, category_id=category_id)
+        return schemas.Category.model_validate(db_category) if db_category else None
+
+    category = await response_cache.aget_or_set(cache_key(CATEGORIES, "detail", category_id), lambda: run_db(db, load))
+    if category is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    return db_category
+    validators = conditional.item_validators(category)
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    conditional.set_validators(response, validators)
+    return category
 
 # POST, PUT, DELETE for categories are not explicitly required by the task for managers.
 # If they were, they would look similar to PieceOfArt endpoints, guarded by get_current_manager.
 
 # Example: Create Category (Manager Only) - if it were required
 @router.post("/", response_model=schemas.Category, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     *, # Ensures all following parameters are keyword-only
     db: Session = Depends(get_db),
     category_in: schemas.CategoryCreate,
@@ -54,18 +98,17 @@ def create_category(
     """
     Create new category. (Manager only)
     """
-    existing_category = crud.get_category_by_name(db, name=category_in.name)
-    if existing_category:
+    try:
+        return await run_db(db, crud.create_category, category=category_in)
+    except crud.UniqueViolation:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A category with this name already exists."
         )
-    category = crud.create_category(db=db, category=category_in)
-    return category
 
 
 @router.put("/{category_id}", response_model=schemas.Category)
-def update_category(
+async def update_category(
     *,
     db: Session = Depends(get_db),
     category_id: int,
@@ -75,35 +118,52 @@ def update_category(
     """
     Update a category. (Manager only)
     """
-    db_category = crud.get_category(db, category_id=category_id)
-    if not db_category:
+    try:
+        category = await run_db(db, crud.update_category, category_id=category_id, category_update=category_in)
+    except crud.UniqueViolation:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Another category with this name already exists."
+        )
+    if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    # Check for name conflict if name is being changed
-    if category_in.name and category_in.name != db_category.name:
-        existing_category_with_new_name = crud.get_category_by_name(db, name=category_in.name)
-        if existing_category_with_new_name and existing_category_with_new_name.id != category_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Another category with this name already exists."
-            )
-    category = crud.update_category(db=db, category_id=category_id, category_update=category_in)
     return category
 
 
-@router.delete("/{category_id}", response_model=schemas.Category)
-def delete_category(
+@router.delete("/{category_id}", response_model=schemas.CategoryDeleted)
+async def delete_category(
     *,
     db: Session = Depends(get_db),
     category_id: int,
+    reassign_to: Optional[int] = Query(None, description="Move the category's pieces of art to this category"),
+    cascade: bool = Query(False, description="Delete the category's pieces of art with it"),
     current_manager: models.Manager = Depends(deps.get_current_manager)
 ):
     """
     Delete a category. (Manager only)
+    Fails with 400 while pieces of art still belong to it, unless they are moved with
+    `reassign_to=<id>` or deleted with `cascade=true` in the same transaction.
+    The response reports how many pieces were moved or deleted.
     """
-    db_category = crud.get_category(db, category_id=category_id)
-    if not db_category:
+    if reassign_to is not None and cascade:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either reassign_to or cascade, not both.")
+    if reassign_to == category_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot reassign pieces to the category being deleted.")
+    try:
+        deleted = await run_db(db, crud.delete_category, category_id=category_id, reassign_to=reassign_to, cascade=cascade)
+    except crud.ForeignKeyViolation:
+        if reassign_to is not None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Category with id {reassign_to} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The category still has pieces of art; pass reassign_to or cascade=true, or move them first."
+        )
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    # Add any pre-delete checks here, e.g., if category is in use by pieces of art
-    # For now, directly delete.
-    deleted_category = crud.delete_category(db=db, category_id=category_id)
-    return deleted_category
+    category, pieces = deleted
+    result = schemas.CategoryDeleted.model_validate(category)
+    if reassign_to is not None:
+        result.pieces_reassigned = pieces
+    else:
+        result.pieces_deleted = pieces
+    return result
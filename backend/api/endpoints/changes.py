@@ -0,0 +1,55 @@
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+import crud
+import schemas
+from core import pagination
+from database import get_db, run_db
+
+router = APIRouter()
+
+def _parse_since(since: Optional[str]) -> Tuple[int, int]:
+    """Feed position (txid, id) of a cursor. Cursors from before txids were recorded only carry the id."""
+    payload = pagination.parse_after_payload(since)
+    if payload is None:
+        return 0, 0
+    txid = payload.get("txid", 0)
+    if not isinstance(txid, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return txid, payload["id"]
+
+@router.get("/", response_model=schemas.CatalogChangesPage)
+async def read_changes(
+    db: Session = Depends(get_db),
+    since: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (or an export's X-Changes-Cursor)"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Changes feed for delta sync. Publicly accessible.
+    Lists catalog writes after `since` in commit order, including deletions (op="delete").
+    Within a page only the latest change per item is kept; fetch upserted items by id.
+    Without `since`, the feed starts from the oldest change kept (see CHANGES_RETENTION_DAYS).
+    A `since` older than that answers 410: resync from the export.
+    """
+    after = _parse_since(since)
+    if since is not None and after < await run_db(db, crud.get_catalog_changes_pruned_position):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="The cursor is older than the retained changes; resync from the export.",
+        )
+    changes = await run_db(db, crud.get_catalog_changes, after=after, limit=limit)
+
+    # Compact: an item changed several times within the page only needs its last entry
+    latest: Dict[Tuple[str, int], schemas.CatalogChange] = {}
+    for change in changes:
+        latest.pop((change.entity, change.entity_id), None)
+        latest[(change.entity, change.entity_id)] = schemas.CatalogChange.model_validate(change)
+
+    last_txid, last_id = (changes[-1].txid, changes[-1].id) if changes else after
+    return schemas.CatalogChangesPage(
+        changes=list(latest.values()),
+        next_cursor=pagination.encode_cursor(last_id, txid=last_txid),
+        has_more=len(changes) == limit,
+    )
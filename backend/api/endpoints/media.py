@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Request, status
+
+import models
+import schemas
+import uploads
+from api import deps
+
+router = APIRouter()
+
+@router.post(
+    "/",
+    response_model=schemas.MediaUpload,
+    status_code=status.HTTP_201_CREATED,
+    # The body is parsed by uploads.store_upload, so describe it for the docs by hand
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {uploads.UPLOAD_FIELD: {"type": "string", "format": "binary"}},
+                        "required": [uploads.UPLOAD_FIELD],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_media(
+    request: Request,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Upload an image (JPEG, PNG, GIF, TIFF, WebP or AVIF) as the `file` field of a multipart form. (Manager only)
+    The file is streamed to media storage and stored once per distinct content; the returned
+    `url` can be used as a piece's `image_url`.
+    """
+    return await uploads.store_upload(request)
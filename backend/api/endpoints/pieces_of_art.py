@@ -1,28 +1,356 @@
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import FrozenSet, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 import crud
+import exporter
+import importer
 import models
 import schemas
 from api import deps # For get_db and potentially get_current_manager later
+from database import run_db
+from core import conditional, pagination
+from core.cache import PIECES, cache_key, response_cache
+from core.config import settings
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.PieceOfArt])
-def read_pieces_of_art(
+def _parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """The requested sparse fieldset (`id` is always included), or None for all fields."""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(schemas.PIECE_OF_ART_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(schemas.PIECE_OF_ART_FIELDS)}."
+        )
+    return frozenset(requested | {"id"})
+
+@router.get("/", response_model=Union[List[schemas.PieceOfArt], List[schemas.PieceOfArtSummary]])
+async def read_pieces_of_art(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
-    category_id: Optional[int] = Query(None)
+    category_id: Optional[int] = Query(None),
+    after: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    view: Literal["full", "summary"] = Query("full", description="`summary` returns only id, name, image_url and image_srcset"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `name,image_srcset` (overrides view)")
 ):
     """
     Retrieve all pieces of art.
     Optionally filter by category_id.
-    Supports pagination with skip and limit.
+    Supports pagination with skip and limit, or keyset pagination with `after`
+    (skip is ignored when a cursor is given). The next page's cursor is returned
+    in the X-Next-Cursor header.
+    `view=summary` and `fields=` load and return only the selected columns.
+    Answers If-None-Match / If-Modified-Since with 304 without loading the page.
     """
-    pieces_of_art = crud.get_pieces_of_art(db, skip=skip, limit=limit, category_id=category_id)
+    after_id = pagination.parse_after(after)
+    selected = _parse_fields(fields)
+    if selected is None and view == "summary":
+        selected = schemas.PIECE_OF_ART_SUMMARY_FIELDS
+    if selected is None:
+        schema = schemas.PieceOfArt
+    elif fields is None:
+        schema = schemas.PieceOfArtSummary
+    else:
+        schema = schemas.piece_of_art_fields_model(selected)
+    projection = None if selected is None else tuple(sorted(selected))
+
+    stats = await response_cache.aget_or_set(
+        cache_key(PIECES, "list", "stats", category_id=category_id),
+        lambda: run_db(db, crud.get_pieces_of_art_stats, category_id=category_id),
+    )
+    validators = conditional.collection_validators(
+        PIECES, *stats, skip=skip, limit=limit, category_id=category_id, after=after_id, fields=projection
+    )
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+
+    def load(session: Session):
+        pieces = crud.get_pieces_of_art(session, skip=skip, limit=limit, category_id=category_id, after_id=after_id, fields=selected)
+        return [schema.model_validate(p) for p in pieces], pagination.next_cursor(pieces, limit)
+
+    key = cache_key(PIECES, "list", skip=skip, limit=limit, category_id=category_id, after=after_id, fields=projection)
+    pieces_of_art, cursor = await response_cache.aget_or_set(key, lambda: run_db(db, load))
+    pagination.set_next_cursor_header(response, cursor)
+    conditional.set_validators(response, validators)
+    if fields is not None:
+        # Ad-hoc fieldsets have no declared schema, so bypass response_model validation
+        return ORJSONResponse([piece.model_dump(mode="json") for piece in pieces_of_art], headers=dict(response.headers))
     return pieces_of_art
 
-# We can add POST, PUT, DELETE later as needed for full admin CRUD
+@router.get("/search", response_model=List[schemas.PieceOfArt])
+async def search_pieces_of_art(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in names and descriptions"),
+    limit: int = Query(50, ge=1, le=200),
+    category_id: Optional[int] = Query(None),
+    after: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page")
+):
+    """
+    Full-text search over piece names and descriptions, best matches first.
+    Three-character queries match name substrings instead (see SEARCH_FTS_MIN_LENGTH).
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    cursor_payload = pagination.parse_after_payload(after) or {}
+    after_id, after_rank = cursor_payload.get("id"), cursor_payload.get("rank")
+    if after_rank is not None and not isinstance(after_rank, (int, float)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    def load(session: Session):
+        rows = crud.search_pieces_of_art(
+            session, q, limit=limit, category_id=category_id, after_id=after_id, after_rank=after_rank
+        )
+        cursor = None
+        if len(rows) == limit:
+            last_piece, last_rank = rows[-1]
+            cursor = pagination.encode_cursor(last_piece.id, rank=last_rank) if last_rank is not None else pagination.encode_cursor(last_piece.id)
+        return [schemas.PieceOfArt.model_validate(piece) for piece, _ in rows], cursor
+
+    key = cache_key(PIECES, "list", "search", q=q.strip(), limit=limit, category_id=category_id, after=after)
+    pieces_of_art, cursor = await response_cache.aget_or_set(key, lambda: run_db(db, load))
+    pagination.set_next_cursor_header(response, cursor)
+    return pieces_of_art
+
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = [int(piece_id) for piece_id in ids.split(",") if piece_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers.")
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No ids given.")
+    return parsed
+
+async def _get_pieces_batch(db: Session, ids: List[int]) -> schemas.PieceOfArtBatch:
+    """
+    Resolves ids through the per-piece detail cache (shared with GET /{piece_id}); the misses
+    are loaded with one query. Items keep the request order; duplicates are returned once.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > schemas.PIECE_OF_ART_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {schemas.PIECE_OF_ART_BATCH_MAX_IDS} ids per request."
+        )
+    keys = {piece_id: cache_key(PIECES, "detail", piece_id) for piece_id in ids}
+
+    def load(session: Session, missing_ids: List[int]):
+        pieces = crud.get_pieces_of_art_by_ids(session, missing_ids)
+        return {keys[p.id]: schemas.PieceOfArt.model_validate(p) for p in pieces}
+
+    found = await response_cache.aget_many_or_set(
+        list(keys.values()), lambda missing: run_db(db, load, [key[2] for key in missing])
+    )
+    return schemas.PieceOfArtBatch(
+        items=[found[keys[piece_id]] for piece_id in ids if keys[piece_id] in found],
+        missing=[piece_id for piece_id in ids if keys[piece_id] not in found],
+    )
+
+@router.get("/batch", response_model=schemas.PieceOfArtBatch)
+async def read_pieces_of_art_batch(
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    ids: str = Query(..., description="Comma-separated piece ids, e.g. 3,1,2"),
+):
+    """
+    Get many pieces of art by id in one request, in the order requested.
+    Ids that don't exist are listed in `missing`. For long lists use POST /batch.
+    Answers If-None-Match / If-Modified-Since with 304.
+    """
+    batch = await _get_pieces_batch(db, _parse_ids(ids))
+    validators = conditional.combined_validators(
+        [conditional.item_validators(piece, piece.category) for piece in batch.items], "missing", *batch.missing
+    )
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    conditional.set_validators(response, validators)
+    return batch
+
+@router.post("/batch", response_model=schemas.PieceOfArtBatch)
+async def read_pieces_of_art_batch_post(
+    batch_request: schemas.PieceOfArtBatchRequest,
+    db: Session = Depends(deps.get_db),
+):
+    """Same as GET /batch, with the ids in the body: {"ids": [3, 1, 2]}."""
+    return await _get_pieces_batch(db, batch_request.ids)
+
+def _bulk_result(affected_ids: List[int], requested_ids: Optional[List[int]]) -> schemas.PieceOfArtBulkResult:
+    affected = set(affected_ids)
+    missing = [piece_id for piece_id in dict.fromkeys(requested_ids or []) if piece_id not in affected]
+    return schemas.PieceOfArtBulkResult(affected=len(affected_ids), missing=missing)
+
+@router.post("/bulk-update", response_model=schemas.PieceOfArtBulkResult)
+async def bulk_update_pieces_of_art(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_in: schemas.PieceOfArtBulkUpdate,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Update many pieces of art in one transaction. (Manager only)
+    Either apply the same `changes` to every piece matching `filter` (ids and/or category_id),
+    e.g. to move a whole category, or send per-piece `patches`.
+    Returns the number of pieces updated and the requested ids that matched nothing.
+    """
+    try:
+        if bulk_in.patches is not None:
+            patches = [patch.model_dump(exclude_unset=True) for patch in bulk_in.patches]
+            updated = await run_db(db, crud.bulk_patch_pieces_of_art, patches)
+            return _bulk_result(updated, [patch.id for patch in bulk_in.patches])
+        updated = await run_db(
+            db, crud.bulk_update_pieces_of_art, bulk_in.changes.model_dump(exclude_unset=True),
+            ids=bulk_in.filter.ids, category_id=bulk_in.filter.category_id
+        )
+        return _bulk_result(updated, bulk_in.filter.ids)
+    except crud.ForeignKeyViolation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="A category given in the update was not found.")
+
+@router.post("/bulk-delete", response_model=schemas.PieceOfArtBulkResult)
+async def bulk_delete_pieces_of_art(
+    *,
+    db: Session = Depends(deps.get_db),
+    filter_in: schemas.PieceOfArtFilter,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Delete every piece of art matching the filter (ids and/or category_id) in one statement. (Manager only)
+    Returns the number of pieces deleted and the requested ids that matched nothing.
+    """
+    deleted = await run_db(db, crud.bulk_delete_pieces_of_art, ids=filter_in.ids, category_id=filter_in.category_id)
+    return _bulk_result(deleted, filter_in.ids)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_pieces_of_art(
+    db: Session = Depends(deps.get_db),
+    since: Optional[datetime] = Query(None, description="Only pieces created or updated at/after this time (ISO 8601)"),
+):
+    """
+    Stream every piece of art, with its category, as NDJSON (one JSON object per line).
+    Publicly accessible. For incremental sync, pass the X-Export-Timestamp header of the
+    previous export as `since`, or follow /api/changes from the X-Changes-Cursor header
+    (which also reports deletions).
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Database time and change log position at the start of the export: anything changed after
+    # this point is picked up by the next incremental export or by the changes feed
+    exported_at = await run_db(db, crud.get_database_now)
+    changes_txid, changes_id = await run_db(db, crud.get_catalog_changes_position)
+    changes_cursor = pagination.encode_cursor(changes_id, txid=changes_txid)
+    body = exporter.aiter_export(since) if settings.DATABASE_ASYNC else exporter.iter_export(since)
+    return StreamingResponse(
+        body,
+        media_type=exporter.MEDIA_TYPE,
+        headers={
+            exporter.EXPORT_TIMESTAMP_HEADER: exported_at.isoformat(),
+            exporter.CHANGES_CURSOR_HEADER: changes_cursor,
+        },
+    )
+
+@router.post("/import", response_model=schemas.PieceOfArtImportResult)
+async def import_pieces_of_art(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(..., description="JSON Lines or CSV with name, description, image_url and category_id or category_name"),
+    format: Optional[Literal["jsonl", "csv"]] = Query(None, description="Defaults to detection from the file name / content type"),
+    batch_size: int = Query(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Bulk import pieces of art. (Manager only)
+    Rows are inserted in batches of `batch_size`; invalid rows are reported with their line
+    number and skipped without aborting the import.
+    """
+    fmt = format or importer.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not detect the file format; pass format=jsonl or format=csv."
+        )
+    return await importer.import_file_async(db, file.file, fmt, batch_size=batch_size)
+
+@router.get("/{piece_id}", response_model=schemas.PieceOfArt)
+async def read_piece_of_art(
+    piece_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+):
+    """
+    Get a specific piece of art by ID. Publicly accessible.
+    Answers If-None-Match / If-Modified-Since with 304.
+    """
+    def load(session: Session):
+        db_piece = crud.get_piece_of_art(session, piece_of_art_id=piece_id)
+        return schemas.PieceOfArt.model_validate(db_piece) if db_piece else None
+
+    piece = await response_cache.aget_or_set(cache_key(PIECES, "detail", piece_id), lambda: run_db(db, load))
+    if piece is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Piece of art not found")
+    validators = conditional.item_validators(piece, piece.category)
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    conditional.set_validators(response, validators)
+    return piece
+
+def _category_not_found(category_id: Optional[int]) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Category with id {category_id} not found.")
+
+@router.post("/", response_model=schemas.PieceOfArt, status_code=status.HTTP_201_CREATED)
+async def create_piece_of_art(
+    *, # Ensures all following parameters are keyword-only
+    db: Session = Depends(deps.get_db),
+    piece_in: schemas.PieceOfArtCreate,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Create new piece of art. (Manager only)
+    """
+    try:
+        return await run_db(db, crud.create_piece_of_art, piece_of_art=piece_in)
+    except crud.ForeignKeyViolation:
+        raise _category_not_found(piece_in.category_id)
+
+@router.put("/{piece_id}", response_model=schemas.PieceOfArt)
+async def update_piece_of_art(
+    *,
+    db: Session = Depends(deps.get_db),
+    piece_id: int,
+    piece_in: schemas.PieceOfArtUpdate,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Update a piece of art. (Manager only)
+    """
+    try:
+        piece = await run_db(db, crud.update_piece_of_art, piece_of_art_id=piece_id, piece_of_art_update=piece_in)
+    except crud.ForeignKeyViolation:
+        raise _category_not_found(piece_in.category_id)
+    if not piece:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Piece of art not found")
+    return piece
+
+@router.delete("/{piece_id}", response_model=schemas.PieceOfArt)
+async def delete_piece_of_art(
+    *,
+    db: Session = Depends(deps.get_db),
+    piece_id: int,
+    current_manager: models.Manager = Depends(deps.get_current_manager)
+):
+    """
+    Delete a piece of art. (Manager only)
+    """
+    piece = await run_db(db, crud.delete_piece_of_art, piece_of_art_id=piece_id)
+    if not piece:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Piece of art not found")
+    return piece
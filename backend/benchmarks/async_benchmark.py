@@ -0,0 +1,128 @@
+"""
+Async database benchmark: throughput and latency of catalog reads with DATABASE_ASYNC=false
+(sync Session on the request threadpool) and DATABASE_ASYNC=true (AsyncSession over asyncpg).
+
+The same workload runs against each mode: concurrent clients alternating a list page
+(GET /api/pieces/?limit=20 from a random keyset cursor) and a piece (GET /api/pieces/{id} for a
+random id). The response cache is disabled so every request reaches the database.
+
+In async mode, endpoints call the crud.py functions through AsyncSession.run_sync (see
+database.run_db): the SQL goes through asyncpg, but the ORM work around it (compiling the query,
+building objects from the rows) runs on the event loop rather than on a worker thread. Async mode
+saves the threadpool hop and the blocking driver, not the CPU work of the ORM.
+
+Needs a migrated database with pieces of art (e.g. seeded by benchmarks.search_benchmark):
+
+    export DATABASE_URL=postgresql://.../museum_bench
+    python -m benchmarks.async_benchmark --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING) # One line per request otherwise
+
+MODES = {"sync": "false", "async": "true"} # mode -> DATABASE_ASYNC
+KINDS = ("list", "detail")
+
+def _serve(port: int, database_async: str) -> None:
+    os.environ["DATABASE_ASYNC"] = database_async
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    import uvicorn
+    uvicorn.run("main:app", port=port, log_level="warning", access_log=False)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_up(base_url: str) -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/api/healthcheck")
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Benchmark server at {base_url} did not start")
+
+async def _load(base_url: str, max_id: int, concurrency: int, duration: float) -> Dict[str, List[float]]:
+    from core.pagination import encode_cursor
+
+    latencies: Dict[str, List[float]] = {kind: [] for kind in KINDS}
+    deadline = time.perf_counter() + duration
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency), timeout=60) as client:
+        async def worker(seed: int):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                for kind in KINDS:
+                    if kind == "list":
+                        request = client.get("/api/pieces/", params={"limit": 20, "after": encode_cursor(rng.randint(0, max_id))})
+                    else:
+                        request = client.get(f"/api/pieces/{rng.randint(1, max_id)}")
+                    started = time.perf_counter()
+                    response = await request
+                    if response.status_code not in (200, 404): # Deleted ids are fine
+                        raise RuntimeError(f"{response.request.url}: {response.status_code}")
+                    latencies[kind].append(time.perf_counter() - started)
+        await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return latencies
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run_mode(mode: str, max_id: int, args) -> Dict[str, List[float]]:
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port, MODES[mode]), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(base_url)
+        asyncio.run(_load(base_url, max_id, args.concurrency, args.warmup))
+        return asyncio.run(_load(base_url, max_id, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog reads with sync and async database sessions.")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load per mode")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    from sqlalchemy import text
+
+    from database import engine
+    with engine.connect() as connection:
+        max_id = connection.execute(text("SELECT max(id) FROM pieces_of_art")).scalar()
+    engine.dispose() # The servers are forked from this process: don't hand them its pooled connection
+    if not max_id:
+        raise SystemExit("No pieces of art in the database")
+
+    logger.info(f"{'mode':>6} {'kind':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in args.modes:
+        latencies = run_mode(mode, max_id, args)
+        total = sum(len(values) for values in latencies.values())
+        for kind, values in latencies.items():
+            values = [seconds * 1000 for seconds in values]
+            logger.info(
+                f"{mode:>6} {kind:>7} {len(values) / args.duration:>8.1f}"
+                f" {statistics.median(values):>8.1f} {percentile(values, 0.99):>8.1f}"
+            )
+        logger.info(f"{mode:>6} {'all':>7} {total / args.duration:>8.1f}")
+
+if __name__ == "__main__":
+    main()
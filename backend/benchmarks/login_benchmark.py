@@ -0,0 +1,129 @@
+"""
+Login benchmark: catalog read latency and login throughput during a burst of logins, with bcrypt
+- inline: verified on the request threadpool by a sync endpoint, as /api/auth/login did before
+  the password hashing pool (served here at /api/auth/login-inline);
+- pool: verified on security.password_hasher, as /api/auth/login does (503 when saturated).
+
+Needs a migrated database with a manager (e.g. seeded by initial_data.py):
+
+    python -m benchmarks.login_benchmark --email admin@museum.com --password ... --logins 64 --duration 10
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import socket
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import httpx
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING) # One line per request otherwise
+
+LOGIN_PATHS = {"inline": "/api/auth/login-inline", "pool": "/api/auth/login"}
+READ_PATH = "/api/categories/?limit=20"
+
+def create_app():
+    """The API plus the pre-pool login endpoint."""
+    from fastapi import Depends, HTTPException, status
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+
+    import crud
+    import security
+    from database import get_sync_db
+    from main import app
+
+    @app.post("/api/auth/login-inline")
+    def login_inline(db: Session = Depends(get_sync_db), form_data: OAuth2PasswordRequestForm = Depends()):
+        manager = crud.get_manager_by_email(db, email=form_data.username)
+        if not manager or not security.verify_password(form_data.password, manager.hashed_password):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+        return {"access_token": security.create_access_token(subject=manager.email), "token_type": "bearer"}
+
+    return app
+
+def _serve(port: int) -> None:
+    import uvicorn
+    uvicorn.run("benchmarks.login_benchmark:create_app", factory=True, port=port, log_level="warning", access_log=False)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _burst(base_url: str, login_path: str, credentials: Dict[str, str], logins: int, readers: int, duration: float):
+    statuses: Counter = Counter()
+    read_latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=logins + readers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def login_worker():
+            while time.perf_counter() < deadline:
+                response = await client.post(login_path, data=credentials)
+                statuses[response.status_code] += 1
+
+        async def read_worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(READ_PATH)
+                response.raise_for_status()
+                read_latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*[login_worker() for _ in range(logins)], *[read_worker() for _ in range(readers)])
+    return statuses, read_latencies
+
+def _wait_until_up(base_url: str) -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/api/healthcheck")
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Benchmark server at {base_url} did not start")
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run_mode(mode: str, args) -> Tuple[Counter, List[float]]:
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port,), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(base_url)
+        credentials = {"username": args.email, "password": args.password}
+        return asyncio.run(_burst(base_url, LOGIN_PATHS[mode], credentials, args.logins, args.readers, args.duration))
+    finally:
+        server.terminate()
+        server.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog reads during a login burst.")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login requests")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent catalog reads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--modes", nargs="+", choices=list(LOGIN_PATHS), default=list(LOGIN_PATHS))
+    args = parser.parse_args()
+
+    logger.info(f"{'mode':>6} {'logins/s':>9} {'503/s':>7} {'reads/s':>8} {'read p50 ms':>12} {'read p95 ms':>12} {'read p99 ms':>12}")
+    for mode in args.modes:
+        statuses, latencies = run_mode(mode, args)
+        latencies = [seconds * 1000 for seconds in latencies]
+        logger.info(
+            f"{mode:>6} {statuses[200] / args.duration:>9.1f} {statuses[503] / args.duration:>7.1f} {len(latencies) / args.duration:>8.1f}"
+            f" {statistics.median(latencies):>12.1f} {percentile(latencies, 0.95):>12.1f} {percentile(latencies, 0.99):>12.1f}"
+        )
+        unexpected = {code: count for code, count in statuses.items() if code not in (200, 503)}
+        if unexpected:
+            logger.warning(f"{mode}: unexpected login responses {unexpected}")
+
+if __name__ == "__main__":
+    main()
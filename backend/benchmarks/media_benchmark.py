@@ -0,0 +1,134 @@
+"""
+Media serving benchmark: requests/s and MB/s by file size for each way /media can answer.
+
+- python: MediaFiles streams the body from a worker thread (MEDIA_SENDFILE_HEADER unset).
+- sendfile: MediaFiles answers with MEDIA_SENDFILE_HEADER and no body, as behind nginx. This is
+  the Python share of a proxied download; the proxy's own sendfile throughput is not included.
+- staticfiles: Starlette's StaticFiles, which served /media before MediaFiles.
+- revalidate: conditional GETs (If-None-Match) answered with 304 by MediaFiles.
+
+Each mode runs in its own uvicorn process, loaded by client processes for a fixed duration.
+
+    python -m benchmarks.media_benchmark --duration 10 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING) # One line per request otherwise
+
+FILE_SIZES = {"16KiB": 16 * 1024, "1MiB": 1024 * 1024, "16MiB": 16 * 1024 * 1024}
+MODES = ("python", "sendfile", "staticfiles", "revalidate")
+
+def create_app():
+    """App served by each benchmark server: MediaFiles under /media, StaticFiles under /static."""
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from starlette.staticfiles import StaticFiles
+
+    from media_files import MediaFiles
+    from storage import LocalStorage
+
+    root = os.environ["MEDIA_ROOT"]
+    return Starlette(routes=[
+        Mount("/media", MediaFiles(LocalStorage(root, "/media"))),
+        Mount("/static", StaticFiles(directory=root)),
+    ])
+
+def _serve(port: int, media_root: str, sendfile: bool) -> None:
+    os.environ["MEDIA_ROOT"] = media_root
+    os.environ["MEDIA_SENDFILE_HEADER"] = "X-Accel-Redirect" if sendfile else ""
+    import uvicorn
+    uvicorn.run("benchmarks.media_benchmark:create_app", factory=True, port=port, log_level="warning", access_log=False)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _load(url: str, headers: Dict[str, str], concurrency: int, duration: float) -> Tuple[int, int]:
+    requests = received = 0
+    deadline = time.perf_counter() + duration
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal requests, received
+            while time.perf_counter() < deadline:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code >= 400:
+                        raise RuntimeError(f"GET {url}: {response.status_code}")
+                    async for chunk in response.aiter_raw():
+                        received += len(chunk)
+                requests += 1
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests, received
+
+def _client(args: Tuple[str, Dict[str, str], int, float]) -> Tuple[int, int]:
+    return asyncio.run(_load(*args))
+
+def _wait_until_up(base_url: str) -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/media/missing")
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Benchmark server at {base_url} did not start")
+
+def run_mode(mode: str, media_root: str, keys: Dict[str, str], args) -> List[Tuple[str, float, float]]:
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port, media_root, mode == "sendfile"), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        _wait_until_up(base_url)
+        for label, key in keys.items():
+            url = f"{base_url}/{'static' if mode == 'staticfiles' else 'media'}/{key}"
+            headers = {}
+            if mode == "revalidate":
+                headers["if-none-match"] = httpx.get(url).headers["etag"]
+            per_client = max(1, args.concurrency // args.clients)
+            with multiprocessing.Pool(args.clients) as pool:
+                totals = pool.map(_client, [(url, headers, per_client, args.duration)] * args.clients)
+            requests = sum(count for count, _ in totals)
+            received = sum(size for _, size in totals)
+            results.append((label, requests / args.duration, received / args.duration / 2 ** 20))
+    finally:
+        server.terminate()
+        server.join()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark media file serving.")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode and file size")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent requests in total")
+    parser.add_argument("--clients", type=int, default=2, help="client processes sharing the concurrency")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as media_root:
+        keys = {}
+        for label, size in FILE_SIZES.items():
+            key = f"originals/{label.lower()}/{label.lower()}.bin"
+            os.makedirs(os.path.join(media_root, os.path.dirname(key)), exist_ok=True)
+            with open(os.path.join(media_root, key), "wb") as file:
+                file.write(os.urandom(size))
+            keys[label] = key
+
+        logger.info(f"{'mode':>12} {'file':>6} {'req/s':>9} {'MB/s':>9}")
+        for mode in args.modes:
+            for label, requests_per_second, megabytes_per_second in run_mode(mode, media_root, keys, args):
+                logger.info(f"{mode:>12} {label:>6} {requests_per_second:>9.1f} {megabytes_per_second:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Search benchmark: full-text search vs the trigram ILIKE fallback, by query length.
+
+Seeds a dedicated database with a generated catalog (deterministic pseudo-words with a Zipf-like
+frequency, names of 2-4 words, descriptions of 8-30) and times the first page of
+crud.search_pieces_of_art with each strategy for word prefixes of 1-8 characters, taken from
+frequent, mid-frequency and rare words and for prefixes that match nothing. The results pick
+SEARCH_FTS_MIN_LENGTH: queries of 3 characters up to it take the trigram path.
+
+    export DATABASE_URL=postgresql://.../museum_bench # Seeding adds rows: don't point it at real data
+    alembic upgrade head
+    python -m benchmarks.search_benchmark --rows 1000000
+"""
+import argparse
+import io
+import logging
+import random
+import statistics
+import time
+from itertools import accumulate
+from typing import Dict, List, Tuple
+
+import crud
+import models
+from core.config import settings
+from database import SessionLocal, engine
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+VOCABULARY_SIZE = 50000
+SEED_BATCH_SIZE = 50000
+SYLLABLES = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"] + ["an", "el", "in", "or", "us", "ar", "on", "is"]
+# Words sampled for each frequency band: (label, first rank, last rank)
+FREQUENCY_BANDS = [("frequent", 0, 200), ("mid", 2000, 5000), ("rare", 20000, VOCABULARY_SIZE)]
+NO_MATCH_LETTERS = "jqwxy" # Not in any syllable: queries of them match nothing, the slowest case for ILIKE
+# (crud._TRIGRAM_MIN_LENGTH, SEARCH_FTS_MIN_LENGTH) forcing each path for every query length
+STRATEGIES = {"trigram": (0, 10 ** 6), "full-text": (0, 0)}
+
+def vocabulary(rng: random.Random) -> List[str]:
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.choice((1, 2, 2, 3, 3, 4)))))
+    return sorted(words, key=lambda word: (rng.random(), word))
+
+def seed(rows: int, words: List[str], rng: random.Random) -> None:
+    db = SessionLocal()
+    try:
+        existing = db.query(models.PieceOfArt).count()
+        category_ids = [category_id for (category_id,) in db.query(models.Category.id)]
+        for index in range(len(category_ids), 50):
+            category = models.Category(name=f"Benchmark category {index}")
+            db.add(category)
+            db.flush()
+            category_ids.append(category.id)
+        db.commit()
+    finally:
+        db.close()
+    if existing >= rows:
+        logger.info(f"{existing} pieces already present, not seeding")
+        return
+
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words)))) # Zipf
+    connection = engine.raw_connection()
+    try:
+        started = time.perf_counter()
+        for offset in range(existing, rows, SEED_BATCH_SIZE):
+            buffer = io.StringIO()
+            for number in range(offset, min(rows, offset + SEED_BATCH_SIZE)):
+                name = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 4))).title()
+                description = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 30)))
+                buffer.write(f"{name}\t{description}\thttps://images.example.com/{number}.jpg\t{rng.choice(category_ids)}\n")
+            buffer.seek(0)
+            with connection.cursor() as cursor:
+                cursor.copy_expert("COPY pieces_of_art (name, description, image_url, category_id) FROM STDIN", buffer)
+            connection.commit()
+            logger.info(f"seeded {min(rows, offset + SEED_BATCH_SIZE)} rows ({time.perf_counter() - started:.0f} s)")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE pieces_of_art")
+        connection.commit()
+    finally:
+        connection.close()
+
+def sample_queries(words: List[str], length: int, per_band: int, rng: random.Random) -> List[Tuple[str, str]]:
+    queries = []
+    for band, first, last in FREQUENCY_BANDS:
+        candidates = [word[:length] for word in words[first:last] if len(word) >= length]
+        queries += [(band, query) for query in rng.sample(candidates, min(per_band, len(candidates)))]
+    queries += [("no match", "".join(rng.choices(NO_MATCH_LETTERS, k=length))) for _ in range(per_band)]
+    return queries
+
+def time_query(q: str, min_lengths: Tuple[int, int], runs: int) -> Tuple[float, int]:
+    """Median seconds for the first page (limit 50) and the number of rows it returned."""
+    crud._TRIGRAM_MIN_LENGTH, settings.SEARCH_FTS_MIN_LENGTH = min_lengths
+    timings = []
+    db = SessionLocal()
+    try:
+        for _ in range(runs + 1): # The first run warms the cache and is discarded
+            started = time.perf_counter()
+            rows = crud.search_pieces_of_art(db, q, limit=50)
+            timings.append(time.perf_counter() - started)
+            db.rollback()
+    finally:
+        db.close()
+    return statistics.median(timings[1:]), len(rows)
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text vs trigram search by query length.")
+    parser.add_argument("--rows", type=int, default=1000000, help="pieces to seed the database up to")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(range(1, 9)))
+    parser.add_argument("--queries", type=int, default=5, help="sample queries per frequency band and length")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per query (median is kept)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words = vocabulary(rng)
+    seed(args.rows, words, rng)
+
+    results: Dict[Tuple[int, str, str], List[Tuple[float, int]]] = {}
+    for length in args.lengths:
+        for band, q in sample_queries(words, length, args.queries, rng):
+            for strategy, min_lengths in STRATEGIES.items():
+                results.setdefault((length, strategy, band), []).append(time_query(q, min_lengths, args.runs))
+                results.setdefault((length, strategy, "all"), []).append(results[length, strategy, band][-1])
+
+    logger.info(f"\n{'length':>6} {'strategy':>10} {'queries':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'avg rows':>8}")
+    for (length, strategy, band), samples in sorted(results.items()):
+        timings = [seconds * 1000 for seconds, _ in samples]
+        logger.info(
+            f"{length:>6} {strategy:>10} {band:>9} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f}"
+            f" {max(timings):>8.2f} {statistics.mean(rows for _, rows in samples):>8.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
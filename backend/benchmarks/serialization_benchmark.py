@@ -0,0 +1,113 @@
+"""
+Serialization benchmark: encoding a page of pieces of art with jsonable_encoder + json.dumps
+(JSONResponse) vs pydantic's JSON-mode dump + orjson (ORJSONResponse, the app's default response
+class).
+
+Builds a page of PieceOfArt rows in memory (no database), each with its category and a long
+description, validates them into schemas.PieceOfArt as the endpoints do, then times rendering the
+response body with each strategy. Also reports the body size as is and compressed as the API
+would send it (gzip at RESPONSE_COMPRESSION_GZIP_LEVEL, brotli at
+RESPONSE_COMPRESSION_BROTLI_QUALITY, if the brotli package is installed).
+
+    python -m benchmarks.serialization_benchmark --page-size 200 --runs 200
+"""
+import argparse
+import gzip
+import logging
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+import models
+import schemas
+from core.config import settings
+
+try:
+    import brotli
+except ImportError: # Optional, as for the compression middleware
+    brotli = None
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "oil canvas portrait landscape light shadow brushwork pigment varnish gallery restoration "
+    "provenance collection museum study sketch fresco panel tempera gilded frame composition"
+).split()
+
+def build_page(page_size: int, description_words: int, rng: random.Random) -> List[models.PieceOfArt]:
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    categories = [
+        models.Category(id=index + 1, name=f"Category {index}", description=" ".join(rng.choices(WORDS, k=40)), created_at=created)
+        for index in range(5)
+    ]
+    pieces = []
+    for index in range(page_size):
+        category = categories[index % len(categories)]
+        pieces.append(models.PieceOfArt(
+            id=index + 1,
+            name=" ".join(rng.choices(WORDS, k=3)).title(),
+            description=" ".join(rng.choices(WORDS, k=description_words)),
+            image_url=f"/media/originals/{index:02x}/{rng.getrandbits(128):032x}.jpg",
+            image_variants=[
+                {"url": f"/media/derivatives/{index:02x}/{width}.{format}", "width": width, "format": format}
+                for format in ("avif", "webp") for width in (320, 640, 1280)
+            ],
+            category_id=category.id,
+            category=category,
+            created_at=created + timedelta(minutes=index),
+            updated_at=created + timedelta(days=1, minutes=index),
+        ))
+    return pieces
+
+def strategies() -> Dict[str, Callable[[List[schemas.PieceOfArt]], bytes]]:
+    adapter = TypeAdapter(List[schemas.PieceOfArt]) # What FastAPI serializes a response_model with
+    return {
+        "jsonable_encoder+json": lambda page: JSONResponse(jsonable_encoder(page)).body,
+        "orjson": lambda page: ORJSONResponse(adapter.dump_python(page, mode="json")).body,
+    }
+
+def time_strategy(render: Callable[[List[schemas.PieceOfArt]], bytes], page: List[schemas.PieceOfArt], runs: int) -> List[float]:
+    render(page) # Warm up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization.")
+    parser.add_argument("--page-size", type=int, default=200, help="pieces per page")
+    parser.add_argument("--description-words", type=int, default=300, help="words per piece description")
+    parser.add_argument("--runs", type=int, default=200, help="timed renders per strategy")
+    args = parser.parse_args()
+
+    rows = build_page(args.page_size, args.description_words, random.Random(42))
+    start = time.perf_counter()
+    page = [schemas.PieceOfArt.model_validate(row) for row in rows]
+    logger.info(f"validated {len(page)} pieces from ORM objects in {(time.perf_counter() - start) * 1000:.2f} ms (common to both)")
+
+    logger.info(f"{'strategy':>22} {'p50 ms':>8} {'p95 ms':>8} {'identity':>10} {'gzip':>9} {'br':>9}")
+    for name, render in strategies().items():
+        timings = time_strategy(render, page, args.runs)
+        body = render(page)
+        gzip_size = len(gzip.compress(body, compresslevel=settings.RESPONSE_COMPRESSION_GZIP_LEVEL))
+        br_size = str(len(brotli.compress(body, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY))) if brotli else "n/a"
+        logger.info(
+            f"{name:>22} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f}"
+            f" {len(body):>10} {gzip_size:>9} {br_size:>9}"
+        )
+
+if __name__ == "__main__":
+    main()
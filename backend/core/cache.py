@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from core.config import settings
+
+# In-process response cache for the public catalog endpoints.
+# The catalog only changes through the manager-only write routes, so list/detail results can be
+# served from memory for a short TTL; crud.py invalidates the affected namespace on every write.
+# Note: the cache is per process. With several workers, a write only invalidates the worker that
+# handled it; the others converge once their entries expire (bounded by the TTL).
+
+_MISSING = object()
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled and maxsize > 0 and ttl > 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped per namespace on invalidation, so a value loaded before a concurrent write
+        # committed is not stored after that write has already invalidated the namespace.
+        self._generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0 # Dropped to respect maxsize (LRU)
+        self.expirations = 0 # Dropped because the TTL elapsed
+        self.invalidations = 0 # Dropped by an explicit invalidate()/clear()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not self.enabled:
+            return default
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for `key`, computing it with `loader()` on a miss.
+        None results (e.g. not found) are returned but not stored.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generations.get(key[0], 0)
+        value = loader()
+        if value is not None and self._generations.get(key[0], 0) == generation:
+            self.set(key, value)
+        return value
+
+    async def aget_or_set(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_set for async endpoints: `loader()` returns an awaitable."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generations.get(key[0], 0)
+        value = await loader()
+        if value is not None and self._generations.get(key[0], 0) == generation:
+            self.set(key, value)
+        return value
+
+    async def aget_many_or_set(self, keys: List[Tuple], loader: Callable[[List[Tuple]], Awaitable[Dict[Tuple, Any]]]) -> Dict[Tuple, Any]:
+        """
+        Batch form of aget_or_set: every missing key is loaded by a single `loader(missing_keys)`
+        call returning {key: value}. Keys it leaves out (e.g. not found) are absent from the
+        result and, like None values, not stored.
+        """
+        found: Dict[Tuple, Any] = {}
+        missing = []
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            generations = {key[0]: self._generations.get(key[0], 0) for key in missing}
+            loaded = await loader(missing)
+            for key, value in loaded.items():
+                if value is not None and self._generations.get(key[0], 0) == generations[key[0]]:
+                    self.set(key, value)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, namespace: str, *parts: Hashable) -> int:
+        """
+        Drops every key starting with (namespace, *parts).
+        Keys are tuples built by `cache_key`, so invalidate("pieces") drops all piece entries
+        and invalidate("pieces", "detail", 5) only the detail entry for piece 5.
+        """
+        prefix = (namespace,) + parts
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [key for key in self._data if isinstance(key, tuple) and key[:len(prefix)] == prefix]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drops every entry for which predicate(key, value) is true."""
+        with self._lock:
+            stale = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            for namespace in {key[0] for key in self._data if isinstance(key, tuple)}:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._data),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+def cache_key(namespace: str, route: str, *args: Hashable, **params: Any) -> Tuple:
+    """
+    Builds a hashable key from the namespace, route name, positional parts (e.g. an item id)
+    and (order-independent) query params: cache_key("pieces", "detail", 5) -> ("pieces", "detail", 5).
+    """
+    return (namespace, route) + args + tuple(sorted(params.items()))
+
+# Shared instance used by the catalog endpoints and invalidated from crud.py
+response_cache = TTLCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
+
+# Decoded bearer token -> manager identity, so guarded routes skip the JWT decode and the
+# manager SELECT while a token is fresh. Invalidated by crud.py whenever a manager changes.
+manager_cache = TTLCache(
+    maxsize=settings.MANAGER_CACHE_MAX_ENTRIES,
+    ttl=settings.MANAGER_CACHE_TTL_SECONDS,
+    enabled=settings.MANAGER_CACHE_ENABLED,
+)
+
+# Cache namespaces
+CATEGORIES = "categories"
+PIECES = "pieces"
@@ -0,0 +1,71 @@
+import re
+from typing import List, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError: # Optional: without it responses are only gzip-compressed
+    BrotliMiddleware = None
+
+# Response compression for JSON/NDJSON payloads. Brotli is preferred when the client accepts it,
+# then gzip (at `gzip_level`); bodies under `minimum_size` are sent as is, since compressing them costs
+# more than it saves. Excluded paths (media: already-compressed images, byte ranges) pass through.
+#
+# A compressed body is a different byte sequence than the one a strong ETag was computed for, so
+# responses to clients accepting gzip/br carry the ETag as weak (W/"..."), whether this particular
+# body was compressed or not (304s and small bodies included): the validator a client stores then
+# doesn't flip between strong and weak with the response size. If-None-Match uses weak comparison
+# (core/conditional.py), so revalidation works either way. Every response also gets
+# `Vary: Accept-Encoding`, since its encoding depends on that header.
+
+COMPRESSED_ENCODINGS = ("gzip", "br")
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Content codings listed in an Accept-Encoding header, lowercased, without those refused with q=0."""
+    accepted = []
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding and not re.search(r"q\s*=\s*0(\.0*)?\s*$", params):
+            accepted.append(coding.strip().lower())
+    return accepted
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, brotli_quality: int = 4, gzip_level: int = 6, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+        # Both just look for their coding's name in Accept-Encoding (`gzip;q=0` included), so they
+        # are only called once the header says the coding is accepted. brotli-asgi's own gzip
+        # fallback always compresses at level 9, hence the separate gzip middleware.
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.brotli = None
+        if BrotliMiddleware is not None:
+            # Low brotli qualities compress about as fast as gzip -6 with smaller output
+            self.brotli = BrotliMiddleware(app, quality=brotli_quality, minimum_size=minimum_size, gzip_fallback=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        weaken_etag = any(encoding in accepted for encoding in COMPRESSED_ENCODINGS)
+        if "br" in accepted and self.brotli is not None:
+            compressed = self.brotli
+        elif "gzip" in accepted:
+            compressed = self.gzip
+        else:
+            compressed = self.app
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "accept-encoding" not in headers.get("vary", "").lower(): # gzip adds it to compressed bodies
+                    headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and (weaken_etag or "content-encoding" in headers) and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+            await send(message)
+
+        await compressed(scope, receive, send_with_validators)
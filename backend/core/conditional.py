@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+# Conditional GET support (ETag / Last-Modified) for the catalog endpoints.
+# Validators are derived from row timestamps (single items) or from a cheap aggregate
+# (count, max changed-at, max id) for collections, so a 304 can be answered before the
+# list is loaded or serialized.
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag: a quoted digest of the given parts."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def _changed_at(obj: Any) -> Optional[datetime]:
+    return obj.updated_at or obj.created_at
+
+def item_validators(item: Any, *related: Any) -> Validators:
+    """
+    Validators for a single row, plus any embedded rows whose changes alter the
+    representation (e.g. the category nested in a piece of art).
+    """
+    objs = [item] + [obj for obj in related if obj is not None]
+    etag = make_etag(*(f"{type(obj).__name__}:{obj.id}:{_changed_at(obj)}" for obj in objs))
+    stamps = [stamp for stamp in (_changed_at(obj) for obj in objs) if stamp is not None]
+    return Validators(etag, max(stamps, default=None))
+
+def combined_validators(validators: List[Validators], *parts: Any) -> Validators:
+    """
+    Validators for a response assembled from several items (e.g. a batch get): one ETag over
+    theirs plus any extra parts (such as the ids that were not found), and the latest Last-Modified.
+    """
+    etag = make_etag(*(v.etag for v in validators), *parts)
+    stamps = [v.last_modified for v in validators if v.last_modified is not None]
+    return Validators(etag, max(stamps, default=None))
+
+def collection_validators(scope: str, count: int, last_changed: Optional[datetime], max_id: Optional[int], **params: Any) -> Validators:
+    """
+    Validators for a list response from aggregate stats of the underlying rows.
+    The count and max id change on deletes/inserts and last_changed on updates; the query
+    params are mixed in so every page/filter gets its own ETag.
+    Clients relying on If-Modified-Since alone cannot observe deletions; If-None-Match is exact.
+    """
+    etag = make_etag(scope, count, last_changed, max_id, *sorted(params.items()))
+    return Validators(etag, last_changed)
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None: # Naive timestamps are stored as UTC
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """Evaluates If-None-Match (preferred) or If-Modified-Since against the current validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses weak comparison, so W/ prefixes from intermediaries are ignored
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return validators.etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return _as_utc(validators.last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+def set_validators(response: Response, validators: Validators) -> None:
+    response.headers["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_as_utc(validators.last_modified), usegmt=True)
+    # Caches may store the response but must revalidate it (cheaply, via the validators above)
+    response.headers["Cache-Control"] = "no-cache"
+
+def not_modified(validators: Validators) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, validators)
+    return response
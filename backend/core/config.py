@@ -34,10 +34,90 @@ class Settings:
     else:
         DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
+    # Connection pool (applies to both the sync and the async engine)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", -1)) # Seconds; -1 disables recycling
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() in ('true', '1', 't', 'yes')
+
+    # Serve API requests through an AsyncSession (asyncpg) instead of the sync psycopg2 engine.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the postgresql+asyncpg driver.
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "False").lower() in ('true', '1', 't', 'yes')
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "a_very_secret_key_please_change_it_in_env")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+    # Dedicated pool for bcrypt hashing/verification so logins don't occupy the request threadpool.
+    # "thread" is enough because bcrypt releases the GIL; "process" isolates it completely.
+    PASSWORD_HASHER_EXECUTOR: str = os.getenv("PASSWORD_HASHER_EXECUTOR", "thread").lower()
+    PASSWORD_HASHER_WORKERS: int = int(os.getenv("PASSWORD_HASHER_WORKERS", min(4, os.cpu_count() or 1)))
+    # Jobs allowed to wait for a worker; further logins are shed with 503 until the queue drains
+    PASSWORD_HASHER_MAX_PENDING: int = int(os.getenv("PASSWORD_HASHER_MAX_PENDING", 32))
+
+    # How PieceOfArt.category is loaded on read paths: "joined" (single LEFT OUTER JOIN),
+    # "selectin" (one batched SELECT ... WHERE id IN (...)) or "lazy" (one query per row, old behaviour)
+    PIECE_CATEGORY_LOADING: str = os.getenv("PIECE_CATEGORY_LOADING", "joined").lower()
+
+    # In-process cache for the public catalog read endpoints (see core/cache.py)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() in ('true', '1', 't', 'yes')
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 60))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+    # gzip/brotli compression of API responses (see core/compression.py)
+    RESPONSE_COMPRESSION_ENABLED: bool = os.getenv("RESPONSE_COMPRESSION_ENABLED", "True").lower() in ('true', '1', 't', 'yes')
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", 1024)) # Bytes
+    RESPONSE_COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", 4))
+    RESPONSE_COMPRESSION_GZIP_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", 6))
+
+    # Request/SQL timing metrics served at /api/metrics (see instrumentation.py)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() in ('true', '1', 't', 'yes')
+    # Bearer token for the Prometheus scraper; without it, /api/metrics only accepts managers' access tokens
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # Cache of authenticated managers per access token (see api/deps.py)
+    MANAGER_CACHE_ENABLED: bool = os.getenv("MANAGER_CACHE_ENABLED", "True").lower() in ('true', '1', 't', 'yes')
+    MANAGER_CACHE_TTL_SECONDS: float = float(os.getenv("MANAGER_CACHE_TTL_SECONDS", 60))
+    MANAGER_CACHE_MAX_ENTRIES: int = int(os.getenv("MANAGER_CACHE_MAX_ENTRIES", 256))
+
+    # Search queries of 3 characters up to this length (exclusive) use a trigram ILIKE on the name
+    # instead of full-text search; see benchmarks/search_benchmark.py
+    SEARCH_FTS_MIN_LENGTH: int = int(os.getenv("SEARCH_FTS_MIN_LENGTH", 4))
+
+    # Rows fetched per round-trip from the server-side cursor by the NDJSON export (exporter.py)
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # Rows inserted per INSERT/commit by the bulk piece importer (importer.py)
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+    # Changes feed entries older than this are deleted by prune_changes.py; clients whose cursor
+    # is older get 410 from /api/changes and resync from the export
+    CHANGES_RETENTION_DAYS: int = int(os.getenv("CHANGES_RETENTION_DAYS", 30))
+
+    # Media storage (see storage.py). MEDIA_URL may be absolute when media is served from another host.
+    MEDIA_STORAGE_BACKEND: str = os.getenv("MEDIA_STORAGE_BACKEND", "storage.LocalStorage")
+    MEDIA_ROOT: str = os.getenv("MEDIA_ROOT", str(Path(__file__).resolve().parent.parent / "media"))
+    MEDIA_URL: str = os.getenv("MEDIA_URL", "/media")
+    # Hand file bodies to a reverse proxy (see media_files.py): e.g. "X-Accel-Redirect" with the
+    # prefix of an nginx `internal` location aliasing MEDIA_ROOT. Empty serves files from Python.
+    MEDIA_SENDFILE_HEADER: str = os.getenv("MEDIA_SENDFILE_HEADER", "")
+    MEDIA_SENDFILE_PREFIX: str = os.getenv("MEDIA_SENDFILE_PREFIX", "/protected-media")
+
+    # Direct image uploads (see uploads.py)
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", 100 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024)) # Bytes buffered per disk write
+
+    # Image derivatives (see images.py): resized WebP/AVIF variants of each piece's image
+    IMAGE_DERIVATIVES_ENABLED: bool = os.getenv("IMAGE_DERIVATIVES_ENABLED", "True").lower() in ('true', '1', 't', 'yes')
+    IMAGE_DERIVATIVE_WIDTHS: List[int] = [int(width) for width in os.getenv("IMAGE_DERIVATIVE_WIDTHS", "200,400,800,1200").split(",")]
+    IMAGE_DERIVATIVE_FORMATS: List[str] = [fmt.strip().lower() for fmt in os.getenv("IMAGE_DERIVATIVE_FORMATS", "webp,avif").split(",")]
+    IMAGE_DERIVATIVE_QUALITY: int = int(os.getenv("IMAGE_DERIVATIVE_QUALITY", 80))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", 2))
+    IMAGE_MAX_SOURCE_BYTES: int = int(os.getenv("IMAGE_MAX_SOURCE_BYTES", 100 * 1024 * 1024))
+    IMAGE_FETCH_TIMEOUT: float = float(os.getenv("IMAGE_FETCH_TIMEOUT", 20))
+
     # For initial data seeding
     INIT_DB: bool = os.getenv("INIT_DB", "False").lower() in ('true', '1', 't', 'yes')
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", "admin@museum.com")
@@ -0,0 +1,45 @@
+import os
+from typing import Dict
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+# Metric primitives come from prometheus_client. Under Gunicorn, set PROMETHEUS_MULTIPROC_DIR
+# (read by prometheus_client itself when it is imported) so each worker writes its values to
+# files there and a scrape of any worker reports the sum over all of them.
+
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+def render_latest() -> bytes:
+    """Exposition of every registered metric; aggregated over all workers in multiprocess mode."""
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+# --- Values of this process, for the JSON stats endpoints ---
+def counter_value(counter: Counter) -> float:
+    for metric in counter.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                return sample.value
+    return 0
+
+def histogram_snapshot(histogram: Histogram) -> Dict:
+    """Cumulative bucket counts ({"0.001": n, ..., "+Inf": n}), sum and count of an unlabelled histogram."""
+    snapshot: Dict = {"buckets": {}, "sum": 0.0, "count": 0}
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_bucket"):
+                snapshot["buckets"][sample.labels["le"]] = int(sample.value)
+            elif sample.name.endswith("_sum"):
+                snapshot["sum"] = sample.value
+            elif sample.name.endswith("_count"):
+                snapshot["count"] = int(sample.value)
+    return snapshot
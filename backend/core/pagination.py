@@ -0,0 +1,58 @@
+import base64
+import json
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+
+# Keyset (cursor) pagination helpers.
+# A cursor is an opaque, URL-safe token wrapping the primary key of the last row on a page.
+# Lists are ordered by id (serial, so it follows insertion order), which lets the next page
+# be fetched with "WHERE id > :last_id ORDER BY id LIMIT :limit" using the primary key index
+# instead of scanning and discarding `skip` rows.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(last_id: int, **extra: Any) -> str:
+    """Extra keys carry other sort keys of the last row (e.g. the search rank)."""
+    raw = json.dumps({"id": last_id, **extra}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor_payload(token: str) -> Dict[str, Any]:
+    """Returns all keys encoded in the token. Raises ValueError if the token is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return payload
+
+def decode_cursor(token: str) -> int:
+    """Returns the last seen id encoded in the token. Raises ValueError if the token is malformed."""
+    return decode_cursor_payload(token)["id"]
+
+def parse_after(after: Optional[str]) -> Optional[int]:
+    """Decodes an `after` query parameter, mapping malformed tokens to a 400."""
+    payload = parse_after_payload(after)
+    return payload["id"] if payload else None
+
+def parse_after_payload(after: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Like parse_after, but returns every key of the cursor."""
+    if after is None:
+        return None
+    try:
+        return decode_cursor_payload(after)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def next_cursor(items: Sequence, limit: int) -> Optional[str]:
+    """A full page may have a successor; a short page is the last one."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(items[-1].id)
+
+def set_next_cursor_header(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,10 +1,125 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import REAL, BigInteger, Integer, Text, and_, any_, bindparam, case, cast, column, delete, func, insert, null, or_, select, tuple_, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
 
+import images
 import models
 import schemas
+from core.cache import CATEGORIES, PIECES, manager_cache, response_cache
+from core.config import settings
 from security import get_password_hash # For creating manager
 
+# Loader options for PieceOfArt.category, selected by settings.PIECE_CATEGORY_LOADING.
+# schemas.PieceOfArt nests the category, so without one of these every serialized row
+# triggers its own lazy SELECT (N+1).
+_CATEGORY_LOADERS = {
+    "joined": joinedload,
+    "selectin": selectinload,
+}
+
+def _with_category(query, strategy: Optional[str] = None):
+    """Applies the configured eager-loading strategy for PieceOfArt.category to a query."""
+    loader = _CATEGORY_LOADERS.get(strategy or settings.PIECE_CATEGORY_LOADING)
+    if loader is None: # "lazy" or unknown value: leave the relationship default
+        return query
+    return query.options(loader(models.PieceOfArt.category))
+
+# Model columns needed for each schemas.PieceOfArt output field, for sparse fieldsets
+_PIECE_FIELD_COLUMNS = {
+    "image_srcset": ("image_variants",),
+    "category": ("category_id",),
+}
+
+def _with_fields(query, fields: Optional[AbstractSet[str]] = None):
+    """
+    Restricts a PieceOfArt query to the columns behind the requested output fields (load_only),
+    joining the category only when it is requested. Without fields, loads the full row and category.
+    """
+    if fields is None:
+        return _with_category(query)
+    columns = {"id"}
+    for field in fields:
+        columns.update(_PIECE_FIELD_COLUMNS.get(field, (field,)))
+    query = query.options(load_only(*(getattr(models.PieceOfArt, column) for column in sorted(columns))))
+    return _with_category(query) if "category" in fields else query
+
+# Writes are single INSERT/UPDATE/DELETE ... RETURNING statements that rely on the database's
+# unique and foreign key constraints instead of checking first; violations are raised as these
+# exceptions (after rolling back) for the routers to map to HTTP errors.
+class IntegrityViolation(Exception):
+    def __init__(self, constraint: Optional[str] = None):
+        super().__init__(constraint)
+        self.constraint = constraint # Name of the violated constraint, when the driver reports it
+
+class UniqueViolation(IntegrityViolation):
+    pass
+
+class ForeignKeyViolation(IntegrityViolation):
+    pass
+
+_VIOLATIONS: Dict[str, Type[IntegrityViolation]] = {
+    "23505": UniqueViolation, # PostgreSQL SQLSTATE unique_violation
+    "23503": ForeignKeyViolation, # foreign_key_violation
+}
+
+@contextmanager
+def _constraint_errors(db: Session) -> Iterator[None]:
+    try:
+        yield
+    except IntegrityError as exc:
+        db.rollback()
+        orig = exc.orig
+        # psycopg2 exposes pgcode/diag; asyncpg's wrapped error carries sqlstate/constraint_name
+        code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+        violation = _VIOLATIONS.get(code)
+        if violation is None:
+            raise
+        constraint = getattr(getattr(orig, "diag", None), "constraint_name", None) or getattr(orig.__cause__, "constraint_name", None)
+        raise violation(constraint) from exc
+
+def _returning_piece(db: Session, statement) -> Optional[models.PieceOfArt]:
+    """
+    Runs an INSERT/UPDATE/DELETE ... RETURNING on pieces_of_art as a CTE joined to the piece's
+    category, so the written row and its category come back from the same statement.
+    Returns the piece with its category attached, or None if no row matched.
+    """
+    written = statement.returning(*models.PieceOfArt.__table__.c).cte("written")
+    piece = aliased(models.PieceOfArt, written)
+    # populate_existing: a piece already in the session's identity map takes the returned values
+    row = db.execute(
+        select(piece, models.Category)
+        .join(models.Category, models.Category.id == piece.category_id)
+        .execution_options(populate_existing=True)
+    ).first()
+    if row is None:
+        return None
+    db_piece_of_art, db_category = row
+    set_committed_value(db_piece_of_art, "category", db_category) # Not a change; avoids a lazy load
+    return db_piece_of_art
+
+# Response cache invalidation, called after each successful commit.
+# Pieces embed their category, so category changes also drop the cached piece entries.
+def _invalidate_categories(category_id: Optional[int] = None) -> None:
+    response_cache.invalidate(CATEGORIES, "list")
+    if category_id is not None:
+        response_cache.invalidate(CATEGORIES, "detail", category_id)
+        response_cache.invalidate(PIECES)
+
+def _invalidate_pieces(piece_of_art_id: Optional[int] = None) -> None:
+    response_cache.invalidate(PIECES, "list")
+    response_cache.invalidate(CATEGORIES, "list", "counts") # Category listings that include piece counts
+    if piece_of_art_id is not None:
+        response_cache.invalidate(PIECES, "detail", piece_of_art_id)
+
+def invalidate_manager(email: str) -> None:
+    """Drops cached token -> manager entries for this email (see api/deps.get_current_manager)."""
+    manager_cache.invalidate_matching(lambda _, entry: entry["manager"]["email"] == email)
+
 # --- Category CRUD --- 
 def get_category(db: Session, category_id: int) -> Optional[models.Category]:
     return db.query(models.Category).filter(models.Category.id == category_id).first()
@@ -12,69 +127,448 @@ def get_category(db: Session, category_id: int) -> Optional[models.Category]:
 def get_category_by_name(db: Session, name: str) -> Optional[models.Category]:
     return db.query(models.Category).filter(models.Category.name == name).first()
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.Category]:
-    return db.query(models.Category).offset(skip).limit(limit).all()
+def get_categories(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Category]:
+    query = db.query(models.Category).order_by(models.Category.id)
+    if after_id is not None: # Keyset pagination: seek past the cursor instead of OFFSET
+        return query.filter(models.Category.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+def get_category_ids_by_name(db: Session) -> Dict[str, int]:
+    """Name -> id for every category, loaded with a single query (used to resolve imports)."""
+    return {name: category_id for category_id, name in db.query(models.Category.id, models.Category.name)}
 
-def create_category(db: Session, category: schemas.CategoryCreate) -> models.Category:
-    db_category = models.Category(**category.model_dump())
-    db.add(db_category)
+def get_categories_stats(db: Session, with_counts: bool = False) -> Tuple:
+    """
+    (count, last changed-at, max id) over all categories; feeds the collection ETag.
+    with_counts appends a digest of every category's piece_count, so listings that include
+    counts change ETag when pieces are added, removed or moved (categories is a small table).
+    """
+    changed_at = func.coalesce(models.Category.updated_at, models.Category.created_at)
+    columns = [func.count(models.Category.id), func.max(changed_at), func.max(models.Category.id)]
+    if with_counts:
+        counts = func.concat(models.Category.id, ":", models.Category.piece_count)
+        columns.append(func.md5(func.string_agg(counts, aggregate_order_by(counts, models.Category.id))))
+    return tuple(db.query(*columns).one())
+
+def reconcile_category_piece_counts(db: Session) -> int:
+    """
+    Recomputes categories.piece_count from pieces_of_art where it has drifted (e.g. after rows
+    were changed with triggers disabled). Returns the number of categories repaired.
+    """
+    actual = (
+        select(func.count(models.PieceOfArt.id))
+        .where(models.PieceOfArt.category_id == models.Category.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(models.Category)
+        .where(models.Category.piece_count != actual)
+        .values(piece_count=actual)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
-    db.refresh(db_category)
+    if result.rowcount:
+        response_cache.invalidate(CATEGORIES, "list")
+    return result.rowcount
+
+def create_category(db: Session, category: schemas.CategoryCreate) -> models.Category:
+    """One INSERT ... RETURNING; raises UniqueViolation if the name is taken."""
+    with _constraint_errors(db):
+        db_category = db.scalars(insert(models.Category).values(**category.model_dump()).returning(models.Category)).one()
+        db.commit()
+    _invalidate_categories()
     return db_category
 
 def update_category(db: Session, category_id: int, category_update: schemas.CategoryUpdate) -> Optional[models.Category]:
-    db_category = get_category(db, category_id)
-    if db_category:
-        update_data = category_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_category, key, value)
+    """One UPDATE ... RETURNING (None if the category doesn't exist); raises UniqueViolation if the new name is taken."""
+    update_data = category_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return get_category(db, category_id)
+    with _constraint_errors(db):
+        db_category = db.scalars(
+            update(models.Category).where(models.Category.id == category_id).values(**update_data).returning(models.Category)
+        ).one_or_none()
         db.commit()
-        db.refresh(db_category)
+    if db_category:
+        _invalidate_categories(category_id)
     return db_category
 
-def delete_category(db: Session, category_id: int) -> Optional[models.Category]:
-    db_category = get_category(db, category_id)
-    if db_category:
-        # Ensure no pieces of art are linked before deleting, or handle accordingly
-        # For this example, we assume this check is done at the API level or not required
-        db.delete(db_category)
+def delete_category(
+    db: Session, category_id: int, reassign_to: Optional[int] = None, cascade: bool = False
+) -> Optional[Tuple[models.Category, int]]:
+    """
+    Deletes a category; returns it with the number of pieces moved or deleted, or None if it
+    doesn't exist. Pieces still in the category are moved to `reassign_to` or, with `cascade`,
+    deleted, each by one set-based statement in the same transaction as the DELETE ... RETURNING.
+    Without either, raises ForeignKeyViolation while pieces reference the category; with an
+    unknown `reassign_to`, raises ForeignKeyViolation too.
+    """
+    pieces = 0
+    with _constraint_errors(db):
+        if reassign_to is not None or cascade:
+            # Lock both categories (in id order, so concurrent deletes can't deadlock): pieces
+            # can't be added to the category, nor the target deleted, until this commits
+            locked = db.scalars(
+                select(models.Category.id)
+                .where(models.Category.id.in_({category_id, reassign_to} - {None}))
+                .order_by(models.Category.id)
+                .with_for_update()
+            ).all()
+            if category_id not in locked:
+                db.rollback()
+                return None
+            if reassign_to is not None and reassign_to not in locked:
+                db.rollback()
+                raise ForeignKeyViolation()
+            table = models.PieceOfArt.__table__
+            if reassign_to is not None:
+                statement = update(table).where(table.c.category_id == category_id).values(category_id=reassign_to)
+            else:
+                statement = delete(table).where(table.c.category_id == category_id)
+            pieces = db.execute(statement).rowcount
+        db_category = db.scalars(
+            delete(models.Category).where(models.Category.id == category_id).returning(models.Category)
+        ).one_or_none()
         db.commit()
-    return db_category
+    if db_category is None:
+        return None
+    _invalidate_categories(category_id) # Also drops piece entries, which embed their category
+    return db_category, pieces
 
 # --- PieceOfArt CRUD --- 
 def get_piece_of_art(db: Session, piece_of_art_id: int) -> Optional[models.PieceOfArt]:
-    return db.query(models.PieceOfArt).filter(models.PieceOfArt.id == piece_of_art_id).first()
+    query = _with_category(db.query(models.PieceOfArt))
+    return query.filter(models.PieceOfArt.id == piece_of_art_id).first()
+
+def get_pieces_of_art_by_ids(db: Session, ids: Sequence[int]) -> List[models.PieceOfArt]:
+    """
+    Pieces with the given ids, in no particular order (missing ids are simply absent).
+    One query, `id = ANY(:ids)` with the ids bound as a single array parameter.
+    """
+    ids_param = bindparam("ids", list(ids), type_=ARRAY(Integer))
+    return _with_category(db.query(models.PieceOfArt)).filter(models.PieceOfArt.id == any_(ids_param)).all()
 
-def get_pieces_of_art(db: Session, skip: int = 0, limit: int = 100, category_id: Optional[int] = None) -> List[models.PieceOfArt]:
-    query = db.query(models.PieceOfArt)
+def get_pieces_of_art(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[AbstractSet[str]] = None,
+) -> List[models.PieceOfArt]:
+    """Pieces ordered by id. With `fields` (schema field names), only the columns behind them are loaded."""
+    query = _with_fields(db.query(models.PieceOfArt), fields).order_by(models.PieceOfArt.id)
     if category_id is not None:
         query = query.filter(models.PieceOfArt.category_id == category_id)
+    if after_id is not None: # Keyset pagination: seek past the cursor instead of OFFSET
+        return query.filter(models.PieceOfArt.id > after_id).limit(limit).all()
     return query.offset(skip).limit(limit).all()
 
+# pg_trgm extracts no trigram from shorter patterns, so ILIKE could not use the index and would scan the table
+_TRIGRAM_MIN_LENGTH = 3
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_pieces_of_art(
+    db: Session,
+    q: str,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    after_rank: Optional[float] = None,
+) -> List[Tuple[models.PieceOfArt, Optional[float]]]:
+    """
+    Searches names and descriptions, returning (piece, rank) pairs.
+    Queries use the GIN-indexed search_vector, ordered by rank then id, except those of 3 up to
+    SEARCH_FTS_MIN_LENGTH characters: these match name substrings with a trigram-indexed ILIKE,
+    ordered by id (rank is None). after_id/after_rank continue from the last row of a page.
+    """
+    q = q.strip()
+    if _TRIGRAM_MIN_LENGTH <= len(q) < settings.SEARCH_FTS_MIN_LENGTH:
+        pattern = f"%{_escape_like(q)}%"
+        query = _with_category(db.query(models.PieceOfArt)).filter(models.PieceOfArt.name.ilike(pattern, escape="\\"))
+        if category_id is not None:
+            query = query.filter(models.PieceOfArt.category_id == category_id)
+        if after_id is not None:
+            query = query.filter(models.PieceOfArt.id > after_id)
+        return [(piece, None) for piece in query.order_by(models.PieceOfArt.id).limit(limit).all()]
+
+    tsquery = func.websearch_to_tsquery(models.SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(models.PieceOfArt.search_vector, tsquery)
+    query = _with_category(db.query(models.PieceOfArt, rank)).filter(models.PieceOfArt.search_vector.op("@@")(tsquery))
+    if category_id is not None:
+        query = query.filter(models.PieceOfArt.category_id == category_id)
+    if after_id is not None and after_rank is not None:
+        # ts_rank_cd returns real; compare as real so the rank round-tripped through the cursor matches exactly
+        last_rank = cast(after_rank, REAL)
+        query = query.filter(or_(rank < last_rank, and_(rank == last_rank, models.PieceOfArt.id > after_id)))
+    rows = query.order_by(rank.desc(), models.PieceOfArt.id).limit(limit).all()
+    return [(piece, piece_rank) for piece, piece_rank in rows]
+
+def select_pieces_of_art_for_export(since: Optional[datetime] = None):
+    """
+    SELECT of every piece (with its category) ordered by id, optionally only those created or
+    updated at/after `since`. Meant to be executed with yield_per so rows stream from a
+    server-side cursor (see exporter.py).
+    """
+    statement = _with_category(select(models.PieceOfArt)).order_by(models.PieceOfArt.id)
+    if since is not None:
+        changed_at = func.coalesce(models.PieceOfArt.updated_at, models.PieceOfArt.created_at)
+        statement = statement.where(changed_at >= since)
+    return statement
+
+def iter_pieces_of_art(db: Session, since: Optional[datetime] = None, batch_size: int = 1000) -> Iterator[models.PieceOfArt]:
+    """Streams pieces for export, holding at most `batch_size` rows in memory."""
+    yield from db.scalars(select_pieces_of_art_for_export(since), execution_options={"yield_per": batch_size})
+
+def get_database_now(db: Session) -> datetime:
+    return db.execute(select(func.now())).scalar_one()
+
+def get_pieces_of_art_stats(db: Session, category_id: Optional[int] = None) -> Tuple:
+    """
+    (count, last changed-at, max id) over the pieces matching the filter; feeds the collection ETag.
+    The last changed-at also covers categories, since each piece embeds its category.
+    """
+    changed_at = func.coalesce(models.PieceOfArt.updated_at, models.PieceOfArt.created_at)
+    category_changed_at = select(
+        func.max(func.coalesce(models.Category.updated_at, models.Category.created_at))
+    ).scalar_subquery()
+    query = db.query(
+        func.count(models.PieceOfArt.id),
+        func.max(changed_at),
+        func.max(models.PieceOfArt.id),
+        category_changed_at,
+    )
+    if category_id is not None:
+        query = query.filter(models.PieceOfArt.category_id == category_id)
+    count, last_changed, max_id, category_last_changed = query.one()
+    stamps = [stamp for stamp in (last_changed, category_last_changed) if stamp is not None]
+    return count, max(stamps, default=None), max_id
+
 def create_piece_of_art(db: Session, piece_of_art: schemas.PieceOfArtCreate) -> models.PieceOfArt:
-    db_piece_of_art = models.PieceOfArt(**piece_of_art.model_dump())
-    db.add(db_piece_of_art)
-    db.commit()
-    db.refresh(db_piece_of_art)
+    """One INSERT ... RETURNING (with the category); raises ForeignKeyViolation for an unknown category."""
+    with _constraint_errors(db):
+        db_piece_of_art = _returning_piece(db, insert(models.PieceOfArt.__table__).values(**piece_of_art.model_dump()))
+        db.commit()
+    _invalidate_pieces()
+    images.schedule_derivatives(db_piece_of_art.id, db_piece_of_art.image_url)
     return db_piece_of_art
 
+def bulk_create_pieces_of_art(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Inserts many pieces in one executemany-style INSERT and a single commit.
+    Rows are plain column dicts (name, description, image_url, category_id); no objects are
+    refreshed, so nothing is returned but the inserted count.
+    """
+    if not rows:
+        return 0
+    inserted = db.execute(
+        insert(models.PieceOfArt).returning(models.PieceOfArt.id, models.PieceOfArt.image_url), rows
+    ).all()
+    db.commit()
+    _invalidate_pieces()
+    for piece_of_art_id, image_url in inserted:
+        images.schedule_derivatives(piece_of_art_id, image_url)
+    return len(rows)
+
+def _piece_update_values(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """SET clause of a pieces_of_art UPDATE; changes may be literals or column expressions."""
+    if "image_url" not in changes:
+        return changes
+    # Variants of the previous image are stale until the new one is processed
+    # (SET expressions see the old row, so this compares against the current image_url)
+    table = models.PieceOfArt.__table__
+    return dict(changes, image_variants=case((table.c.image_url == changes["image_url"], table.c.image_variants), else_=null()))
+
 def update_piece_of_art(db: Session, piece_of_art_id: int, piece_of_art_update: schemas.PieceOfArtUpdate) -> Optional[models.PieceOfArt]:
-    db_piece_of_art = get_piece_of_art(db, piece_of_art_id)
-    if db_piece_of_art:
-        update_data = piece_of_art_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_piece_of_art, key, value)
+    """
+    One UPDATE ... RETURNING (with the category); None if the piece doesn't exist.
+    Raises ForeignKeyViolation for an unknown category.
+    """
+    update_data = piece_of_art_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return get_piece_of_art(db, piece_of_art_id)
+    with _constraint_errors(db):
+        db_piece_of_art = _returning_piece(
+            db,
+            update(models.PieceOfArt.__table__)
+            .where(models.PieceOfArt.__table__.c.id == piece_of_art_id)
+            .values(**_piece_update_values(update_data))
+        )
         db.commit()
-        db.refresh(db_piece_of_art)
+    if db_piece_of_art:
+        _invalidate_pieces(piece_of_art_id)
+        if "image_url" in update_data and db_piece_of_art.image_variants is None:
+            images.schedule_derivatives(piece_of_art_id, db_piece_of_art.image_url)
     return db_piece_of_art
 
+def set_piece_image_variants(db: Session, piece_of_art_id: int, image_url: str, variants: List[Dict[str, Any]]) -> bool:
+    """
+    Records generated derivatives, unless the piece's image_url changed (or the piece was deleted)
+    while they were being generated. Returns whether the piece was updated.
+    """
+    result = db.execute(
+        update(models.PieceOfArt)
+        .where(models.PieceOfArt.id == piece_of_art_id, models.PieceOfArt.image_url == image_url)
+        .values(image_variants=variants)
+    )
+    db.commit()
+    if result.rowcount:
+        _invalidate_pieces(piece_of_art_id)
+    return bool(result.rowcount)
+
+def get_pieces_needing_image_variants(db: Session, include_processed: bool = False) -> List[Tuple[int, str]]:
+    """(id, image_url) of pieces without derivatives, or of every piece with include_processed."""
+    query = db.query(models.PieceOfArt.id, models.PieceOfArt.image_url).order_by(models.PieceOfArt.id)
+    if not include_processed:
+        query = query.filter(models.PieceOfArt.image_variants.is_(None))
+    return [tuple(row) for row in query]
+
 def delete_piece_of_art(db: Session, piece_of_art_id: int) -> Optional[models.PieceOfArt]:
-    db_piece_of_art = get_piece_of_art(db, piece_of_art_id)
+    """One DELETE ... RETURNING (with the category); None if the piece doesn't exist."""
+    db_piece_of_art = _returning_piece(
+        db, delete(models.PieceOfArt.__table__).where(models.PieceOfArt.__table__.c.id == piece_of_art_id)
+    )
+    db.commit()
     if db_piece_of_art:
-        db.delete(db_piece_of_art)
-        db.commit()
+        _invalidate_pieces(piece_of_art_id)
     return db_piece_of_art
 
+# Bulk writes: set-based statements in one transaction, with the caches invalidated once.
+def _piece_filter(ids: Optional[Sequence[int]] = None, category_id: Optional[int] = None) -> List:
+    table = models.PieceOfArt.__table__
+    conditions = []
+    if ids is not None:
+        conditions.append(table.c.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer))))
+    if category_id is not None:
+        conditions.append(table.c.category_id == category_id)
+    return conditions
+
+def _invalidate_pieces_bulk() -> None:
+    # A single pass dropping every piece entry, instead of one detail invalidation per row
+    response_cache.invalidate(PIECES)
+    response_cache.invalidate(CATEGORIES, "list", "counts")
+
+def _finish_bulk_update(db: Session, rows: List, image_changed: Sequence[int]) -> List[int]:
+    """Commits, invalidates and queues derivatives for pieces whose image_url changed."""
+    db.commit()
+    if rows:
+        _invalidate_pieces_bulk()
+    image_changed = set(image_changed)
+    for piece_of_art_id, image_url, image_variants in rows:
+        if piece_of_art_id in image_changed and image_variants is None:
+            images.schedule_derivatives(piece_of_art_id, image_url)
+    return [row[0] for row in rows]
+
+def bulk_update_pieces_of_art(
+    db: Session, changes: Dict[str, Any], ids: Optional[Sequence[int]] = None, category_id: Optional[int] = None
+) -> List[int]:
+    """
+    Applies the same changes to every piece matching the filter (ids and/or category_id) with
+    one UPDATE ... RETURNING. Returns the updated ids; raises ForeignKeyViolation for an
+    unknown category.
+    """
+    table = models.PieceOfArt.__table__
+    statement = (
+        update(table)
+        .where(*_piece_filter(ids, category_id))
+        .values(**_piece_update_values(changes))
+        .returning(table.c.id, table.c.image_url, table.c.image_variants)
+    )
+    with _constraint_errors(db):
+        rows = db.execute(statement).all()
+        return _finish_bulk_update(db, rows, [row[0] for row in rows] if "image_url" in changes else [])
+
+def bulk_patch_pieces_of_art(db: Session, patches: List[Dict[str, Any]]) -> List[int]:
+    """
+    Applies per-piece changes ({"id": ..., <fields>}) in one transaction. Patches setting the
+    same fields are applied together by one UPDATE ... FROM (VALUES ...) RETURNING, so the
+    number of statements depends on the combinations of fields, not on the number of pieces.
+    Returns the updated ids; raises ForeignKeyViolation for an unknown category.
+    """
+    table = models.PieceOfArt.__table__
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for patch in patches:
+        groups.setdefault(tuple(sorted(field for field in patch if field != "id")), []).append(patch)
+
+    rows, image_changed = [], []
+    with _constraint_errors(db):
+        for fields, group in groups.items():
+            patch_values = values(
+                column("id", Integer), *(column(field, table.c[field].type) for field in fields), name="patch"
+            ).data([(patch["id"], *(patch[field] for field in fields)) for patch in group])
+            statement = (
+                update(table)
+                .where(table.c.id == patch_values.c.id)
+                .values(**_piece_update_values({field: patch_values.c[field] for field in fields}))
+                .returning(table.c.id, table.c.image_url, table.c.image_variants)
+            )
+            group_rows = db.execute(statement).all()
+            rows.extend(group_rows)
+            if "image_url" in fields:
+                image_changed.extend(row[0] for row in group_rows)
+        return _finish_bulk_update(db, rows, image_changed)
+
+def bulk_delete_pieces_of_art(db: Session, ids: Optional[Sequence[int]] = None, category_id: Optional[int] = None) -> List[int]:
+    """Deletes every piece matching the filter with one DELETE ... RETURNING id; returns the deleted ids."""
+    table = models.PieceOfArt.__table__
+    deleted = db.execute(delete(table).where(*_piece_filter(ids, category_id)).returning(table.c.id)).scalars().all()
+    db.commit()
+    if deleted:
+        _invalidate_pieces_bulk()
+    return list(deleted)
+
+# --- Changes feed --- 
+# Feed positions are (txid, id) pairs. Transactions with an id below the current snapshot's xmin
+# have all finished, so the changes listed up to there can no longer be joined by earlier ones.
+def _finished_transactions_horizon():
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+def get_catalog_changes(db: Session, after: Tuple[int, int] = (0, 0), limit: int = 1000) -> List[models.CatalogChange]:
+    """Changes after the feed position `after`, in commit order, from finished transactions only."""
+    change = models.CatalogChange
+    return (
+        db.query(change)
+        .filter(tuple_(change.txid, change.id) > tuple_(*after), change.txid < _finished_transactions_horizon())
+        .order_by(change.txid, change.id)
+        .limit(limit)
+        .all()
+    )
+
+def get_catalog_changes_position(db: Session) -> Tuple[int, int]:
+    """Current feed position: every change after it comes from a transaction that may still be running."""
+    return db.execute(select(_finished_transactions_horizon())).scalar_one(), 0
+
+def get_catalog_changes_pruned_position(db: Session) -> Tuple[int, int]:
+    """Feed position up to which changes were pruned; (0, 0) if they never were."""
+    retention = db.get(models.CatalogChangeRetention, 1)
+    return (retention.pruned_txid, retention.pruned_id) if retention else (0, 0)
+
+def prune_catalog_changes(db: Session, retention_days: int) -> int:
+    """
+    Deletes the changes up to the last listed one recorded more than `retention_days` ago, and
+    stores that position (see get_catalog_changes_pruned_position). Returns the deleted count.
+    """
+    change = models.CatalogChange
+    boundary = db.execute(
+        select(change.txid, change.id)
+        .where(change.changed_at < func.now() - timedelta(days=retention_days), change.txid < _finished_transactions_horizon())
+        .order_by(change.txid.desc(), change.id.desc())
+        .limit(1)
+    ).first()
+    if boundary is None:
+        return 0
+    pruned_txid, pruned_id = boundary
+    deleted = db.execute(delete(change).where(tuple_(change.txid, change.id) <= tuple_(pruned_txid, pruned_id))).rowcount
+    db.execute(
+        pg_insert(models.CatalogChangeRetention)
+        .values(id=1, pruned_txid=pruned_txid, pruned_id=pruned_id)
+        .on_conflict_do_update(index_elements=["id"], set_={"pruned_txid": pruned_txid, "pruned_id": pruned_id, "pruned_at": func.now()})
+    )
+    db.commit()
+    return deleted
+
 # --- Manager CRUD --- 
 def get_manager(db: Session, manager_id: int) -> Optional[models.Manager]:
     return db.query(models.Manager).filter(models.Manager.id == manager_id).first()
@@ -86,17 +580,39 @@ def get_managers(db: Session, skip: int = 0, limit: int = 100) -> List[models.Ma
     return db.query(models.Manager).offset(skip).limit(limit).all()
 
 def create_manager(db: Session, manager: schemas.ManagerCreate) -> models.Manager:
-    hashed_password = get_password_hash(manager.password)
-    db_manager = models.Manager(
-        email=manager.email,
-        first_name=manager.first_name,
-        last_name=manager.last_name,
-        hashed_password=hashed_password
-    )
-    db.add(db_manager)
-    db.commit()
-    db.refresh(db_manager)
+    """One INSERT ... RETURNING; raises UniqueViolation if the email is taken."""
+    manager_values = manager.model_dump(exclude={"password"})
+    manager_values["hashed_password"] = get_password_hash(manager.password)
+    with _constraint_errors(db):
+        db_manager = db.scalars(insert(models.Manager).values(**manager_values).returning(models.Manager)).one()
+        db.commit()
+    invalidate_manager(db_manager.email) # In case tokens for a previously deleted manager with this email are cached
+    return db_manager
+
+def _invalidate_manager_id(manager_id: int) -> None:
+    manager_cache.invalidate_matching(lambda _, entry: entry["manager"]["id"] == manager_id)
+
+def update_manager(db: Session, manager_id: int, manager_update: schemas.ManagerUpdate) -> Optional[models.Manager]:
+    """One UPDATE ... RETURNING (None if the manager doesn't exist); raises UniqueViolation if the new email is taken."""
+    update_data = manager_update.model_dump(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        update_data["hashed_password"] = get_password_hash(password)
+    if not update_data:
+        return get_manager(db, manager_id)
+    with _constraint_errors(db):
+        db_manager = db.scalars(
+            update(models.Manager).where(models.Manager.id == manager_id).values(**update_data).returning(models.Manager)
+        ).one_or_none()
+        db.commit()
+    if db_manager:
+        _invalidate_manager_id(manager_id) # Cached entries still hold the previous email
     return db_manager
 
-# Update and Delete for Manager can be added if needed, following similar patterns.
-# For this project, manager creation is primary for seeding, updates might be out of scope for initial setup.
+def delete_manager(db: Session, manager_id: int) -> Optional[models.Manager]:
+    """One DELETE ... RETURNING; None if the manager doesn't exist."""
+    db_manager = db.scalars(delete(models.Manager).where(models.Manager.id == manager_id).returning(models.Manager)).one_or_none()
+    db.commit()
+    if db_manager:
+        _invalidate_manager_id(manager_id)
+    return db_manager
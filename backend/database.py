@@ -1,23 +1,110 @@
+import time
+from typing import Any, Callable, Dict, Union
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from core.config import settings
+from core.metrics import DEFAULT_BUCKETS, Counter, Histogram, counter_value, histogram_snapshot
+
+# --- Connection pool instrumentation ---
+# Time spent waiting for a pooled connection (including opening a new one when under the limit)
+pool_wait_seconds = Histogram("db_pool_wait_seconds", "Time waiting for a pooled connection.", buckets=DEFAULT_BUCKETS)
+# Checkouts that gave up after DB_POOL_TIMEOUT ("QueuePool limit ... reached")
+pool_timeouts = Counter("db_pool_timeouts", "Checkouts that timed out waiting for a connection.")
+
+class _WaitTimingMixin:
+    # _do_get is the pool's internal "obtain a connection" hook in SQLAlchemy 1.4/2.0
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # Pre-ping costs a round-trip per checkout; with pool_recycle below the server/proxy idle
+        # timeout it can usually be turned off
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
 engine = create_engine(
     settings.DATABASE_URL,
     # connect_args={"check_same_thread": False} # Only for SQLite
-    pool_pre_ping=True # Helps with connection drops
+    poolclass=InstrumentedQueuePool,
+    **_pool_options(),
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: objects returned by writes (INSERT/UPDATE ... RETURNING) are serialized
+# after the commit; expiring them would cost a reload SELECT each
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
+# Async engine (asyncpg), only created when DATABASE_ASYNC is enabled.
+# The sync engine above is still used by scripts (initial_data.py) and Alembic.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_url = settings.ASYNC_DATABASE_URL or make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    async_engine = create_async_engine(async_url, poolclass=InstrumentedAsyncQueuePool, **_pool_options())
+    # expire_on_commit=False: returned objects are serialized after the commit, outside the greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def pool_stats() -> Dict[str, Any]:
+    """Live state of this process's connection pool serving API requests, plus checkout wait metrics."""
+    pool = (async_engine.sync_engine if async_engine is not None else engine).pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(), # Negative while fewer than pool_size connections are open
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeouts": int(counter_value(pool_timeouts)),
+        "wait_seconds": histogram_snapshot(pool_wait_seconds),
+    }
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get DB session: an AsyncSession when DATABASE_ASYNC is enabled, else a Session
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Calls fn(session, *args, **kwargs) without blocking the event loop, which lets async
+    endpoints reuse the crud.py functions with either session type.
+    With an AsyncSession, fn runs through run_sync so its IO goes through asyncpg (lazy loads
+    included); with a Session, it runs on the request threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
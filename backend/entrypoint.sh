@@ -21,7 +21,13 @@ else
   echo "Entrypoint: INIT_DB is not 'true'. Skipping initial data seeding."
 fi
 
-# Start Uvicorn server
-# --reload is useful for development. For production, you might remove it or use a process manager like Gunicorn.
-echo "Entrypoint: Starting Uvicorn server..."
-uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+# Start the server
+# RELOAD=true runs a single Uvicorn process with the file watcher, for development.
+# Otherwise Gunicorn manages multiple Uvicorn workers (see gunicorn_conf.py for WEB_CONCURRENCY etc.).
+if [ "${RELOAD}" = "true" ] ; then
+  echo "Entrypoint: RELOAD is true. Starting Uvicorn development server with --reload..."
+  exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+else
+  echo "Entrypoint: Starting Gunicorn with Uvicorn workers..."
+  exec gunicorn -c gunicorn_conf.py main:app
+fi
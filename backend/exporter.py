@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional
+
+import crud
+import models
+import schemas
+from core.config import settings
+
+# Streaming NDJSON export of the whole catalog: one JSON object (schemas.PieceOfArt, including
+# its category) per line. Rows come from a server-side cursor (yield_per) and are written out
+# in chunks, so memory use stays flat regardless of table size.
+# The export opens its own session: the request's session is closed before a streamed
+# response body is produced.
+
+MEDIA_TYPE = "application/x-ndjson"
+# Database time when the export started; the client's `since` for the next incremental export
+EXPORT_TIMESTAMP_HEADER = "X-Export-Timestamp"
+# Changes feed position when the export started; the `since` for /api/changes
+CHANGES_CURSOR_HEADER = "X-Changes-Cursor"
+
+def _render(piece: models.PieceOfArt) -> str:
+    return schemas.PieceOfArt.model_validate(piece).model_dump_json() + "\n"
+
+def _chunks(lines: Iterator[str], batch_size: int) -> Iterator[bytes]:
+    buffer: List[str] = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch_size:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
+
+def iter_export(since: Optional[datetime] = None, batch_size: Optional[int] = None) -> Iterator[bytes]:
+    """NDJSON chunks using the sync engine (Starlette iterates this in its threadpool)."""
+    from database import SessionLocal
+
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        pieces = crud.iter_pieces_of_art(db, since=since, batch_size=batch_size)
+        yield from _chunks((_render(piece) for piece in pieces), batch_size)
+    finally:
+        db.close()
+
+async def aiter_export(since: Optional[datetime] = None, batch_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """NDJSON chunks using the async engine (DATABASE_ASYNC)."""
+    from database import AsyncSessionLocal
+
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(
+            crud.select_pieces_of_art_for_export(since), execution_options={"yield_per": batch_size}
+        )
+        async for partition in result.partitions():
+            yield "".join(_render(piece) for piece in partition).encode()
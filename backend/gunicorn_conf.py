@@ -0,0 +1,53 @@
+# Gunicorn configuration for the production server (see entrypoint.sh).
+# Each worker is a Uvicorn worker, which picks up uvloop and httptools automatically
+# when they are installed (uvicorn[standard], pulled in by fastapi[all]).
+import multiprocessing
+import os
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Worker count: WEB_CONCURRENCY if set, otherwise one async worker per CPU core
+workers = _int_env("WEB_CONCURRENCY", multiprocessing.cpu_count())
+worker_class = os.getenv("WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+bind = os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+
+# Import the app once in the master and fork workers from it (faster start, shared memory pages)
+preload_app = os.getenv("PRELOAD_APP", "true").lower() in ('true', '1', 't', 'yes')
+
+# Recycle each worker after a number of requests, with jitter so they don't all restart at once
+max_requests = _int_env("MAX_REQUESTS", 10000)
+max_requests_jitter = _int_env("MAX_REQUESTS_JITTER", 1000)
+
+timeout = _int_env("WORKER_TIMEOUT", 60)
+graceful_timeout = _int_env("GRACEFUL_TIMEOUT", 30)
+keepalive = _int_env("KEEPALIVE", 5)
+
+loglevel = os.getenv("LOG_LEVEL", "info")
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+
+# Multiprocess metrics (see core/metrics.py): start from an empty directory, without the files of
+# a previous run's workers. Done here because this file is read before the app is preloaded.
+_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir:
+    os.makedirs(_multiproc_dir, exist_ok=True)
+    for _name in os.listdir(_multiproc_dir):
+        if _name.endswith(".db"):
+            os.unlink(os.path.join(_multiproc_dir, _name))
+
+def child_exit(server, worker):
+    # Drop the live gauges (pool, cache entries) of a worker that exited or was recycled
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+def post_fork(server, worker):
+    # With preload_app the engines are created in the master; drop any pooled connections
+    # inherited across the fork so each worker opens its own (the master's stay untouched).
+    from database import async_engine, engine
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,238 @@
+"""
+Image derivatives: resized WebP/AVIF variants of each piece's image, used by clients to build
+srcset attributes (see schemas.PieceOfArt.image_srcset).
+
+Generation runs in a small background thread pool after a piece is created or its image_url
+changes, so writes don't wait for downloading and encoding. Derivatives are stored under a key
+derived from the source image's content hash, so pieces sharing an image share its files and
+regenerating an unchanged image writes nothing.
+
+Backfill pieces without derivatives (e.g. created before the pipeline existed):
+    python images.py [--all]
+"""
+import argparse
+import hashlib
+import http.client
+import io
+import ipaddress
+import logging
+import socket
+import threading
+import urllib.request
+from urllib.parse import urlsplit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from core.config import settings
+from schemas import IMAGE_VARIANT_TYPES
+from storage import get_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError: # Pillow is only needed by the workers; the API still runs without derivatives
+    Image = None
+
+try:
+    import pillow_avif # noqa: F401 (registers the AVIF encoder with Pillow)
+except ImportError:
+    pillow_avif = None
+
+logger = logging.getLogger(__name__)
+
+def supported_formats() -> List[str]:
+    """Configured derivative formats that the installed Pillow can encode."""
+    if Image is None:
+        return []
+    Image.init()
+    encoders = {fmt.lower() for fmt in Image.SAVE}
+    return [fmt for fmt in settings.IMAGE_DERIVATIVE_FORMATS if fmt in IMAGE_VARIANT_TYPES and fmt in encoders]
+
+def derivative_key(digest: str, width: int, fmt: str) -> str:
+    return f"derivatives/{digest[:2]}/{digest}/{width}w.{fmt}"
+
+# --- Fetching remote originals ---
+# image_url is set by managers but fetched by the server, so remote fetches are limited to
+# http(s) and to public addresses: no local files, loopback, private networks or cloud metadata
+# endpoints. The check runs on the address actually connected to (also for every redirect), so a
+# hostname can't resolve to a public address when checked and a private one when connecting.
+
+def _public_address(host: str, port: int) -> tuple:
+    """The first resolved address of host; ValueError if any of them isn't a public address."""
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for _, _, _, _, sockaddr in addresses:
+        ip = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if getattr(ip, "ipv4_mapped", None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise ValueError(f"Refusing to fetch images from non-public address {ip} ({host})")
+    family, socktype, proto, _, sockaddr = addresses[0]
+    return family, socktype, proto, sockaddr
+
+def _create_public_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    family, socktype, proto, sockaddr = _public_address(*address)
+    sock = socket.socket(family, socktype, proto)
+    try:
+        if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+            sock.settimeout(timeout)
+        if source_address:
+            sock.bind(source_address)
+        sock.connect(sockaddr)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+# Only http(s) handlers (no file:, ftp: or data: URLs, also not as redirect targets) and no proxies
+_public_opener = urllib.request.OpenerDirector()
+for _handler in (_PublicHTTPHandler, _PublicHTTPSHandler, urllib.request.HTTPRedirectHandler,
+                 urllib.request.HTTPDefaultErrorHandler, urllib.request.HTTPErrorProcessor):
+    _public_opener.add_handler(_handler())
+
+def fetch_source(image_url: str) -> bytes:
+    """
+    Reads the original image: from media storage when it is stored here, otherwise over HTTP(S)
+    from a public address.
+    """
+    storage = get_storage()
+    key = storage.key_for_url(image_url)
+    if key is not None:
+        with storage.open(key) as source:
+            data = source.read(settings.IMAGE_MAX_SOURCE_BYTES + 1)
+    else:
+        if urlsplit(image_url).scheme.lower() not in ("http", "https"):
+            raise ValueError(f"Unsupported image URL scheme: {image_url}")
+        with _public_opener.open(image_url, timeout=settings.IMAGE_FETCH_TIMEOUT) as response:
+            data = response.read(settings.IMAGE_MAX_SOURCE_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_SOURCE_BYTES:
+        raise ValueError(f"Source image exceeds {settings.IMAGE_MAX_SOURCE_BYTES} bytes")
+    return data
+
+def generate_derivatives(data: bytes) -> List[Dict]:
+    """
+    Encodes the configured widths and formats of an image and stores them.
+    Widths larger than the original are skipped (the original width is used instead), so small
+    images get a single size. Returns variant descriptors: {"url", "width", "height", "format"}.
+    """
+    formats = supported_formats()
+    if not formats:
+        return []
+    storage = get_storage()
+    digest = hashlib.sha256(data).hexdigest()
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        widths = sorted({min(width, image.width) for width in settings.IMAGE_DERIVATIVE_WIDTHS})
+
+        variants = []
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = None
+            for fmt in formats:
+                key = derivative_key(digest, width, fmt)
+                if not storage.exists(key):
+                    if resized is None:
+                        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=fmt.upper(), quality=settings.IMAGE_DERIVATIVE_QUALITY)
+                    storage.save(key, buffer.getvalue())
+                variants.append({"url": storage.url(key), "width": width, "height": height, "format": fmt})
+    return variants
+
+def process_piece_image(piece_of_art_id: int, image_url: str) -> Optional[List[Dict]]:
+    """Generates derivatives for a piece and records them. Returns the variants, or None on failure."""
+    # Imported here: crud schedules work through this module
+    import crud
+    from database import SessionLocal
+
+    try:
+        variants = generate_derivatives(fetch_source(image_url))
+    except Exception:
+        logger.exception("Could not generate image derivatives for piece %s (%s)", piece_of_art_id, image_url)
+        return None
+    db = SessionLocal()
+    try:
+        crud.set_piece_image_variants(db, piece_of_art_id, image_url, variants)
+    finally:
+        db.close()
+    return variants
+
+class DerivativeWorkerPool:
+    """
+    Background threads generating derivatives. Pillow releases the GIL while resampling and
+    encoding, so a few threads keep a core busy without blocking the event loop.
+    The executor is created lazily, after gunicorn forks its workers.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-derivatives")
+        return self._executor
+
+    def submit(self, piece_of_art_id: int, image_url: str) -> Optional[Future]:
+        if not settings.IMAGE_DERIVATIVES_ENABLED or not supported_formats():
+            return None
+        return self._get_executor().submit(process_piece_image, piece_of_art_id, image_url)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+derivative_workers = DerivativeWorkerPool(settings.IMAGE_WORKERS)
+
+def schedule_derivatives(piece_of_art_id: int, image_url: str) -> None:
+    """Queues derivative generation for a piece; returns immediately."""
+    derivative_workers.submit(piece_of_art_id, image_url)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate image derivatives for pieces of art.")
+    parser.add_argument("--all", action="store_true", help="regenerate for every piece, not only those without derivatives")
+    args = parser.parse_args()
+
+    if not supported_formats():
+        raise SystemExit("No derivative format can be encoded: install Pillow (and pillow-avif-plugin for AVIF)")
+
+    import crud
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        pending = crud.get_pieces_needing_image_variants(db, include_processed=args.all)
+    finally:
+        db.close()
+
+    futures = [derivative_workers.submit(piece_of_art_id, image_url) for piece_of_art_id, image_url in pending]
+    failed = sum(1 for future in futures if future is not None and future.result() is None)
+    derivative_workers.shutdown()
+    logger.info(f"Processed {len(futures) - failed} pieces, {failed} failed")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import io
+import json
+import logging
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import crud
+import schemas
+from core.config import settings
+from database import run_db
+
+logger = logging.getLogger(__name__)
+
+# Bulk import of pieces of art from JSON Lines or CSV.
+# Rows are streamed from the file, validated one by one and inserted in batches of
+# `batch_size` with a single INSERT + commit each. Invalid rows are reported and skipped;
+# they never abort the rest of the import.
+
+FORMATS = ("jsonl", "csv")
+MAX_REPORTED_ERRORS = 1000
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    return None
+
+def _iter_jsonl(stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, exc
+
+def _iter_csv(stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(stream)
+    for record in reader:
+        # Empty cells mean "not provided" (e.g. no description)
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in record.items() if key}
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yields (line number, parsed row or the parse exception) from a text stream."""
+    if fmt == "jsonl":
+        return _iter_jsonl(stream)
+    if fmt == "csv":
+        return _iter_csv(stream)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors())
+
+class _Report:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors: List[schemas.PieceOfArtImportError] = []
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(schemas.PieceOfArtImportError(line=line, error=error))
+
+    def result(self) -> schemas.PieceOfArtImportResult:
+        return schemas.PieceOfArtImportResult(
+            created=self.created,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+def _flush(db: Session, batch: List[Tuple[int, Dict[str, Any]]], report: _Report) -> None:
+    if not batch:
+        return
+    try:
+        report.created += crud.bulk_create_pieces_of_art(db, [row for _, row in batch])
+        return
+    except SQLAlchemyError:
+        db.rollback()
+    # The batch was rejected by the database: retry row by row to isolate the bad rows
+    for line, row in batch:
+        try:
+            report.created += crud.bulk_create_pieces_of_art(db, [row])
+        except SQLAlchemyError as exc:
+            db.rollback()
+            report.fail(line, f"Database error: {exc.__class__.__name__}")
+
+def _iter_batches(
+    stream: IO[str], fmt: str, batch_size: int, category_ids: Dict[str, int], report: _Report
+) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Parses and validates rows, yielding batches ready to insert; invalid rows are recorded in `report`."""
+    known_ids = set(category_ids.values())
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    for line, raw in iter_rows(stream, fmt):
+        if isinstance(raw, Exception):
+            report.fail(line, f"Invalid JSON: {raw}")
+            continue
+        if not isinstance(raw, dict):
+            report.fail(line, "Row must be an object")
+            continue
+        try:
+            row = schemas.PieceOfArtImportRow.model_validate(raw)
+        except ValidationError as exc:
+            report.fail(line, _format_validation_error(exc))
+            continue
+
+        if row.category_id is not None:
+            if row.category_id not in known_ids:
+                report.fail(line, f"Category with id {row.category_id} not found")
+                continue
+            category_id = row.category_id
+        elif row.category_name is not None:
+            category_id = category_ids.get(row.category_name)
+            if category_id is None:
+                report.fail(line, f"Category '{row.category_name}' not found")
+                continue
+        else:
+            report.fail(line, "Either category_id or category_name is required")
+            continue
+
+        batch.append((line, {
+            "name": row.name,
+            "description": row.description,
+            "image_url": row.image_url,
+            "category_id": category_id,
+        }))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def import_pieces_of_art(db: Session, stream: IO[str], fmt: str, batch_size: Optional[int] = None) -> schemas.PieceOfArtImportResult:
+    """Imports pieces of art from a JSONL or CSV text stream and reports per-row errors."""
+    batch_size = max(1, batch_size or settings.IMPORT_BATCH_SIZE)
+    # One lookup for all category names/ids used while resolving rows
+    category_ids = crud.get_category_ids_by_name(db)
+    report = _Report()
+    for batch in _iter_batches(stream, fmt, batch_size, category_ids, report):
+        _flush(db, batch, report)
+    return report.result()
+
+def _text_stream(binary: IO[bytes]) -> io.TextIOWrapper:
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+def import_file(db: Session, binary: IO[bytes], fmt: str, batch_size: Optional[int] = None) -> schemas.PieceOfArtImportResult:
+    """import_pieces_of_art over a binary file object (decoded as UTF-8, BOM tolerated)."""
+    stream = _text_stream(binary)
+    try:
+        return import_pieces_of_art(db, stream, fmt, batch_size=batch_size)
+    finally:
+        stream.detach() # Leave the underlying file open for its owner
+
+async def import_file_async(
+    db: Union[Session, AsyncSession], binary: IO[bytes], fmt: str, batch_size: Optional[int] = None
+) -> schemas.PieceOfArtImportResult:
+    """
+    import_file for async endpoints. Reading, parsing and validating the file run on the threadpool;
+    only the category lookup and the batch INSERTs go through run_db, so with an AsyncSession
+    (whose run_sync executes on the event loop) the loop never parses rows.
+    """
+    batch_size = max(1, batch_size or settings.IMPORT_BATCH_SIZE)
+    category_ids = await run_db(db, crud.get_category_ids_by_name)
+    report = _Report()
+    stream = _text_stream(binary)
+    batches = _iter_batches(stream, fmt, batch_size, category_ids, report)
+    try:
+        while True:
+            batch = await run_in_threadpool(next, batches, None)
+            if batch is None:
+                break
+            await run_db(db, _flush, batch, report)
+    finally:
+        stream.detach()
+    return report.result()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import pieces of art from a JSON Lines or CSV file.")
+    parser.add_argument("path", help="File to import (.jsonl/.ndjson or .csv)")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (detected from the file extension by default)")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE, help="Rows per INSERT/commit")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("Could not detect the format from the file name; pass --format")
+
+    from database import SessionLocal # Imported here so the module can be used without opening a session
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as binary:
+            result = import_file(db, binary, fmt, batch_size=args.batch_size)
+    finally:
+        db.close()
+    logger.info(f"Imported {result.created} pieces of art, {result.failed} rows failed.")
+    for error in result.errors:
+        logger.warning(f"Line {error.line}: {error.error}")
+    if result.errors_truncated:
+        logger.warning(f"Only the first {len(result.errors)} errors are shown.")
+
+    # Derivatives for the new pieces were queued as batches committed; finish them before exiting.
+    # With IMAGE_DERIVATIVES_ENABLED=false nothing is queued and `python images.py` can backfill later.
+    from images import derivative_workers
+    logger.info("Waiting for image derivatives...")
+    derivative_workers.shutdown()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
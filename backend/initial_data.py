@@ -55,19 +55,19 @@ def init_db(db: Session) -> None:
         created_categories[cat_name] = category
 
     # Create Pieces of Art
+    # Existing (name, category_id) pairs are loaded once, and the missing pieces are inserted
+    # with a single batched INSERT instead of a query + commit per piece.
+    existing_pieces = {(name, category_id) for name, category_id in db.query(PieceOfArt.name, PieceOfArt.category_id)}
+    new_pieces = []
     for art_data in PIECES_OF_ART_DATA:
-        # Check if piece already exists by name (simple check, could be more robust)
-        # For this seeding, we'll assume if a piece with the same name and category exists, we skip.
         category = created_categories.get(art_data["category_name"])
         if not category:
             logger.warning(f"Category {art_data['category_name']} not found for art piece {art_data['name']}. Skipping.")
             continue
-        
-        # A more robust check would be to query for the piece of art by name AND category_id
-        # existing_piece = db.query(PieceOfArt).filter_by(name=art_data["name"], category_id=category.id).first()
-        # if existing_piece:
-        #     logger.info(f"Art piece '{art_data['name']}' in category '{category.name}' already exists. Skipping.")
-        #     continue
+
+        if (art_data["name"], category.id) in existing_pieces:
+            logger.info(f"Art piece '{art_data['name']}' in category '{category.name}' already exists. Skipping.")
+            continue
 
         art_in = schemas.PieceOfArtCreate(
             name=art_data["name"],
@@ -75,24 +75,11 @@ def init_db(db: Session) -> None:
             image_url=art_data["image_url"],
             category_id=category.id
         )
-        # Simple check: if any piece with this name exists, skip (to avoid duplicates on re-run if names are unique constraint)
-        # This is not ideal if names are not unique across categories. A better check is above.
-        # For now, let's assume we want to avoid re-creating if any piece with this name exists.
-        # This part needs careful consideration based on actual uniqueness constraints.
-        # For simplicity of seeding, we'll try to create and let DB constraints handle if any.
-        # However, it's better to check first to avoid partial commits or errors during seeding.
-        
-        # Let's refine the check: query for piece by name AND category_id to be more specific
-        existing_art_piece = db.query(PieceOfArt).filter(
-            PieceOfArt.name == art_data["name"],
-            PieceOfArt.category_id == category.id
-        ).first()
+        new_pieces.append(art_in.model_dump())
+        existing_pieces.add((art_data["name"], category.id))
+        logger.info(f"Creating art piece: {art_in.name} in category {category.name}")
 
-        if not existing_art_piece:
-            crud.create_piece_of_art(db, piece_of_art=art_in)
-            logger.info(f"Created art piece: {art_in.name} in category {category.name}")
-        else:
-            logger.info(f"Art piece '{art_data['name']}' in category '{category.name}' already exists. Skipping.")
+    crud.bulk_create_pieces_of_art(db, new_pieces)
 
     # Create Manager User
     manager = crud.get_manager_by_email(db, email=MANAGER_DATA["email"])
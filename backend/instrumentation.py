@@ -0,0 +1,172 @@
+"""
+Request and SQL timing, served in the Prometheus text format at /api/metrics.
+
+RequestMetricsMiddleware times every HTTP request and labels it with the route template
+(`/api/pieces/{piece_id}`, not the concrete path) and the response status, so the number of
+series stays bounded. SQL statements are timed by engine events; while a request is running,
+they are also added to its own query count and DB time, giving per-route histograms of both.
+Each request costs two clock reads, a context variable and a few histogram updates; each
+statement two clock reads.
+
+Metrics are prometheus_client metrics; with PROMETHEUS_MULTIPROC_DIR set (Gunicorn), a scrape
+reports the sum over all workers. Pool and cache state lives in each worker, so each worker
+publishes its own at most once a second (see _publish_process_state) and the gauges are summed
+over the live workers.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import Gauge
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.cache import manager_cache, response_cache
+from core.metrics import DEFAULT_BUCKETS, Counter, Histogram, render_latest
+from database import pool_stats
+
+# Number of SQL statements per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Methods used as labels as is; anything else is reported as OTHER
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status (its _count is the request count).",
+    ("method", "route", "status"), buckets=DEFAULT_BUCKETS,
+)
+http_request_db_queries = Histogram("http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), buckets=QUERY_COUNT_BUCKETS)
+http_request_db_seconds = Histogram("http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route"), buckets=DEFAULT_BUCKETS)
+# Every statement, including those run outside requests (scripts, image workers)
+db_query_duration_seconds = Histogram("db_query_duration_seconds", "SQL statement latency, all callers.", buckets=DEFAULT_BUCKETS)
+db_query_errors = Counter("db_query_errors", "SQL statements that raised an error.")
+
+# Per-process state, summed over the live workers
+db_pool_connections = Gauge("db_pool_connections", "Connections in the pool by state.", ("state",), multiprocess_mode="livesum")
+db_pool_size = Gauge("db_pool_size", "Configured pool size.", multiprocess_mode="livesum")
+db_pool_overflow = Gauge("db_pool_overflow", "Connections open beyond pool_size (negative while below it).", multiprocess_mode="livesum")
+cache_entries = Gauge("cache_entries", "Entries in the in-process caches.", ("cache",), multiprocess_mode="livesum")
+cache_hits = Counter("cache_hits", "In-process cache hits.", ("cache",))
+cache_misses = Counter("cache_misses", "In-process cache misses.", ("cache",))
+
+class _RequestDbTiming:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# Set for the duration of a request. Threadpool calls (run_db) and AsyncSession.run_sync run in
+# a copy of the request's context, which refers to the same object, so their statements count too.
+_request_db: ContextVar[Optional[_RequestDbTiming]] = ContextVar("request_db", default=None)
+
+# --- SQL statement timing ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    _record_query(conn)
+
+def _handle_error(exception_context) -> None:
+    if exception_context.connection is not None and exception_context.connection.info.get("query_start"):
+        db_query_errors.inc()
+        _record_query(exception_context.connection)
+
+def _record_query(conn) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_duration_seconds.observe(elapsed)
+    timing = _request_db.get()
+    if timing is not None:
+        timing.queries += 1
+        timing.seconds += elapsed
+
+def instrument_engine(engine: Engine) -> None:
+    """Times the statements of a (sync) engine; for an AsyncEngine pass its sync_engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+# --- Request timing ---
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route") # Set by FastAPI's router on the request scope
+    if route is not None:
+        return route.path
+    if "endpoint" in scope: # A mounted app (media files): report its prefix
+        return scope.get("root_path") or UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500 # Unless the app starts a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        timing = _RequestDbTiming()
+        token = _request_db.set(timing)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Includes sending the body, so streamed responses (exports) count in full
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+            route = _route_label(scope)
+            http_request_duration_seconds.labels(method, route, str(status_code)).observe(elapsed)
+            http_request_db_queries.labels(method, route).observe(timing.queries)
+            http_request_db_seconds.labels(method, route).observe(timing.seconds)
+            _publish_process_state()
+
+# --- Pool and cache state ---
+PUBLISH_INTERVAL_SECONDS = 1.0
+
+_publish_lock = threading.Lock()
+_last_published = 0.0
+_published_totals: Dict[tuple, int] = {} # Cache hit/miss totals already added to the counters
+
+def _add_total(counter: Counter, name: str, total: int) -> None:
+    # The caches keep running totals; the counters get what was added since the last call
+    increase = total - _published_totals.get((counter, name), 0)
+    if increase > 0:
+        counter.labels(name).inc(increase)
+    _published_totals[(counter, name)] = total
+
+def _publish_process_state(force: bool = False) -> None:
+    """Copies this worker's pool and cache state into the metrics, at most once per interval."""
+    global _last_published
+    now = time.monotonic()
+    if not force and now - _last_published < PUBLISH_INTERVAL_SECONDS:
+        return
+    if not _publish_lock.acquire(blocking=force):
+        return # Another thread is publishing
+    try:
+        _last_published = now
+        pool = pool_stats()
+        db_pool_connections.labels("checked_out").set(pool["checked_out"])
+        db_pool_connections.labels("checked_in").set(pool["checked_in"])
+        db_pool_size.set(pool["pool_size"])
+        db_pool_overflow.set(pool["overflow"])
+        for name, cache in (("responses", response_cache), ("managers", manager_cache)):
+            stats = cache.stats()
+            cache_entries.labels(name).set(stats["entries"])
+            _add_total(cache_hits, name, stats["hits"])
+            _add_total(cache_misses, name, stats["misses"])
+    finally:
+        _publish_lock.release()
+
+# --- Exposition ---
+def render_metrics() -> bytes:
+    _publish_process_state(force=True)
+    return render_latest()
@@ -1,8 +1,21 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response
 
+from core.cache import manager_cache, response_cache
+from core.compression import CompressionMiddleware
 from core.config import settings
+from core.metrics import PROMETHEUS_CONTENT_TYPE
+from core.pagination import NEXT_CURSOR_HEADER
+from exporter import CHANGES_CURSOR_HEADER, EXPORT_TIMESTAMP_HEADER
 from api.api import api_router
+from api.deps import get_current_manager, require_metrics_access
+from database import async_engine, engine, pool_stats
+from images import derivative_workers
+from instrumentation import RequestMetricsMiddleware, instrument_engine, render_metrics
+from media_files import MediaFiles
+from security import password_hasher
+from storage import LocalStorage, get_storage
 # from database import engine, Base # For initial table creation if not using Alembic
 
 # If you were to create tables directly without Alembic (not recommended for production/evolution)
@@ -13,9 +26,25 @@ from api.api import api_router
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"/api/openapi.json" # Standard location for OpenAPI spec
+    openapi_url=f"/api/openapi.json", # Standard location for OpenAPI spec
+    # Response models are serialized by pydantic-core; orjson then encodes the result much faster than json.dumps
+    default_response_class=ORJSONResponse,
 )
 
+# Uploaded and derived media are served by the app when kept on the local filesystem
+storage = get_storage()
+serve_media = isinstance(storage, LocalStorage) and storage.base_url.startswith("/")
+
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        brotli_quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY,
+        gzip_level=settings.RESPONSE_COMPRESSION_GZIP_LEVEL,
+        # Media handles its own encodings (precompressed sidecars) and byte ranges
+        exclude_paths=[storage.base_url] if serve_media else [],
+    )
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -24,13 +53,49 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let the browser frontend read the pagination cursor, validators and export timestamp
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified", EXPORT_TIMESTAMP_HEADER, CHANGES_CURSOR_HEADER],
     )
 
+# Added last so it is the outermost middleware and times compression and CORS handling too
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
 app.include_router(api_router, prefix="/api")
 
+if serve_media:
+    app.mount(storage.base_url, MediaFiles(storage), name="media")
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_derivative_workers():
+    derivative_workers.shutdown(wait=False) # Unfinished pieces are picked up by `python images.py`
+
 @app.get("/api/healthcheck")
 def healthcheck():
     return {"status": "ok"}
 
+@app.get("/api/cache/stats", dependencies=[Depends(get_current_manager)]) # Manager only
+def cache_stats():
+    # Hit/miss/eviction counters of the in-process caches, for sizing TTL and max entries
+    return {"responses": response_cache.stats(), "managers": manager_cache.stats()}
+
+@app.get("/api/db/pool", dependencies=[Depends(get_current_manager)]) # Manager only
+def db_pool_stats():
+    # Connection pool usage and checkout wait histogram, for tuning DB_POOL_* per deployment
+    return pool_stats()
+
+if settings.METRICS_ENABLED:
+    @app.get("/api/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+    def metrics():
+        # Request latency, per-request SQL count/time, pool and cache metrics for Prometheus to scrape
+        return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # The initial_data.py script will be run by entrypoint.sh based on INIT_DB env var.
 # No need to call it from here directly.
@@ -0,0 +1,203 @@
+"""
+Serving of media files from local storage (uploaded originals and image derivatives), mounted
+at MEDIA_URL in place of a generic static-files app.
+
+- Every key written by the API is content-hashed (see uploads.py and images.py), so those files
+  are served as `Cache-Control: public, max-age=31536000, immutable` and browsers and CDNs never
+  revalidate them.
+- Single `Range` requests are answered with 206 (or 416), so large scans can be fetched in parts
+  and resumed. `If-Range` is honoured; multi-range requests get the whole file.
+- Precompressed sidecars (`<file>.br`, `<file>.gz`) are sent with Content-Encoding when the
+  client accepts them and no range is requested.
+- File bodies are handed to the server without passing through Python where possible: with
+  MEDIA_SENDFILE_HEADER (e.g. nginx `X-Accel-Redirect`) the proxy sends the file itself, and
+  ASGI servers offering the `http.response.zerocopysend` extension get the file descriptor.
+  Otherwise the file is streamed in chunks from a worker thread.
+"""
+import mimetypes
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from core import conditional
+from core.compression import accepted_encodings
+from core.config import settings
+from storage import LocalStorage
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+# Keys under these prefixes are named after their content hash and never change
+CONTENT_HASHED_PREFIXES = ("originals/", "derivatives/")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content-Encoding -> sidecar suffix, in order of preference
+SIDECAR_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end inclusive) of a single-range `Range` header. Returns None when the header should
+    be ignored (malformed or multi-range) and raises ValueError when it is unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first: # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        if size == 0: # No last bytes to send
+            raise ValueError("Range not satisfiable")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start: # Invalid range: ignored, as required by RFC 9110
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+class FileRangeResponse(Response):
+    """Sends `count` bytes of a file from `offset`, by descriptor when the server supports it."""
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, offset: int, count: int, status_code: int = 200, headers: Optional[dict] = None, send_body: bool = True):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_body = send_body
+        self.headers["content-length"] = str(count)
+
+    def init_headers(self, headers=None) -> None:
+        # Content-Length is set explicitly in __init__; there is no in-memory body
+        self.raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items()]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": self.offset, "count": self.count})
+            finally:
+                file.close()
+            return
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk: # File truncated underneath us; end the body early
+                    remaining = 0
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+class MediaFiles:
+    """ASGI app serving the files of a LocalStorage."""
+
+    def __init__(self, storage: LocalStorage):
+        self.storage = storage
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        # Depending on the Starlette version, a mount's path is either relative to it or still
+        # includes the mount prefix (which is then also the root_path)
+        path, root_path = scope["path"], scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        response = await self.get_response(request, path.lstrip("/"))
+        await response(scope, receive, send)
+
+    def _resolve(self, key: str) -> Optional[str]:
+        if not key or any(part.startswith(".") for part in key.split("/")): # e.g. in-progress uploads
+            return None
+        try:
+            path = self.storage.path(key)
+        except ValueError:
+            return None
+        return str(path) if path.is_file() else None
+
+    async def get_response(self, request: Request, key: str) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        path = await anyio.to_thread.run_sync(self._resolve, key)
+        if path is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        stat = await anyio.to_thread.run_sync(os.stat, path)
+
+        last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        etag = conditional.make_etag(key, stat.st_size, stat.st_mtime_ns)
+        headers = {
+            "accept-ranges": "bytes",
+            "cache-control": IMMUTABLE_CACHE_CONTROL if key.startswith(CONTENT_HASHED_PREFIXES) else "no-cache",
+            "last-modified": format_datetime(last_modified, usegmt=True),
+            "content-type": mimetypes.guess_type(key)[0] or "application/octet-stream",
+        }
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and if_range and if_range.strip() not in (etag, headers["last-modified"]):
+            range_header = None # The client's partial copy is stale: send the whole file
+        # Ranges always refer to the identity encoding, so sidecars are only used for full responses
+        encoded = None
+        if not range_header:
+            encoded = await anyio.to_thread.run_sync(self._find_sidecar, key, accepted_encodings(request.headers.get("accept-encoding", "")))
+        if encoded is not None:
+            encoding, path, size = encoded
+            etag = conditional.make_etag(etag, encoding)
+            headers["content-encoding"] = encoding
+            headers["vary"] = "Accept-Encoding"
+        else:
+            size = stat.st_size
+        headers["etag"] = etag
+
+        if conditional.is_not_modified(request, conditional.Validators(etag, last_modified)):
+            headers.pop("content-type")
+            headers.pop("content-encoding", None)
+            return Response(status_code=304, headers=headers)
+
+        send_body = request.method == "GET"
+        if not range_header:
+            return self._file_response(key, path, 0, size, 200, headers, send_body)
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+        if byte_range is None:
+            return self._file_response(key, path, 0, size, 200, headers, send_body)
+        start, end = byte_range
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return self._file_response(key, path, start, end - start + 1, 206, headers, send_body)
+
+    def _find_sidecar(self, key: str, accepted: List[str]) -> Optional[Tuple[str, str, int]]:
+        for encoding, suffix in SIDECAR_ENCODINGS:
+            if encoding in accepted:
+                sidecar = f"{self.storage.path(key)}{suffix}"
+                if os.path.isfile(sidecar):
+                    return encoding, sidecar, os.path.getsize(sidecar)
+        return None
+
+    def _file_response(self, key: str, path: str, offset: int, count: int, status_code: int, headers: dict, send_body: bool) -> Response:
+        if settings.MEDIA_SENDFILE_HEADER:
+            # The reverse proxy serves the file (with sendfile) from its internal location,
+            # keeping the headers set here; it also handles Range itself, so ask for the whole file.
+            suffix = path[len(str(self.storage.path(key))):] # Sidecar suffix, if any
+            headers = {name: value for name, value in headers.items() if name != "content-range"}
+            headers[settings.MEDIA_SENDFILE_HEADER] = f"{settings.MEDIA_SENDFILE_PREFIX.rstrip('/')}/{key}{suffix}"
+            return Response(status_code=200, headers=headers)
+        return FileRangeResponse(path, offset, count, status_code=status_code, headers=headers, send_body=send_body)
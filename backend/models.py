@@ -1,15 +1,23 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func # For default timestamps
+from sqlalchemy import BigInteger, Column, Computed, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func, text # For default timestamps
 
 from database import Base
 
+# Text search configuration used for PieceOfArt.search_vector (language-neutral: no stemming or stop words).
+# Changing it requires a migration, since the column is generated by PostgreSQL.
+SEARCH_CONFIG = "simple"
+
 class Category(Base):
     __tablename__ = "categories"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True) # The primary key is already indexed
     name = Column(String(255), unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
+    # Number of pieces in the category, maintained by a trigger on pieces_of_art (see the
+    # d41a7f2c9e08 migration); crud.reconcile_category_piece_counts repairs any drift.
+    piece_count = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -18,23 +26,78 @@ class Category(Base):
 class PieceOfArt(Base):
     __tablename__ = "pieces_of_art"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), index=True, nullable=False)
     description = Column(Text, nullable=True)
     image_url = Column(String(1024), nullable=False) # Increased length for URLs
+    # Resized WebP/AVIF variants of image_url, written by the background pipeline in images.py:
+    # [{"url", "width", "height", "format"}]. NULL until generated (or after image_url changes).
+    image_variants = Column(JSONB(none_as_null=True), nullable=True) # None is stored as SQL NULL, not JSON null
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Full-text search document, maintained by PostgreSQL (generated column): name weighted above description.
+    # Deferred so regular reads don't load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
     category = relationship("Category", back_populates="pieces_of_art")
 
+    __table_args__ = (
+        # Category-filtered listings (ordered by id) and the FK check when deleting a category
+        Index("ix_pieces_of_art_category_id_id", "category_id", "id"),
+        Index("ix_pieces_of_art_category_id_created_at", "category_id", "created_at"),
+        Index("ix_pieces_of_art_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram index backing the ILIKE fallback for short search queries (pg_trgm)
+        Index("ix_pieces_of_art_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # Incremental export (`since`) filters on the last change time
+        Index("ix_pieces_of_art_changed_at", func.coalesce(updated_at, created_at)),
+    )
+
 class Manager(Base):
     __tablename__ = "managers"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class CatalogChange(Base):
+    """
+    Append-only log of catalog writes (including deletions, as tombstones), written by triggers
+    on categories and pieces_of_art in the same transaction as the change. The changes feed is
+    ordered by (txid, id), the writing transaction then the row, and only lists transactions older
+    than any still running, so a cursor never skips a change that commits late.
+    Entries older than CHANGES_RETENTION_DAYS are pruned by prune_changes.py.
+    """
+    __tablename__ = "catalog_changes"
+
+    id = Column(BigInteger, primary_key=True)
+    txid = Column(BigInteger, server_default=text("(pg_current_xact_id()::text::bigint)"), nullable=False) # 0 before c6e4b8d2a915
+    entity = Column(String(20), nullable=False) # "category" or "piece"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False) # "upsert" or "delete"
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_catalog_changes_txid_id", txid, id),
+    )
+
+class CatalogChangeRetention(Base):
+    """Single row (id 1): the feed position (txid, id) up to which catalog_changes was pruned."""
+    __tablename__ = "catalog_changes_retention"
+
+    id = Column(Integer, primary_key=True)
+    pruned_txid = Column(BigInteger, nullable=False)
+    pruned_id = Column(BigInteger, nullable=False)
+    pruned_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
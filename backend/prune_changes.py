@@ -0,0 +1,22 @@
+import logging
+
+import crud
+from core.config import settings
+from database import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Deletes changes feed entries older than CHANGES_RETENTION_DAYS, so catalog_changes doesn't grow
+# forever. Run it daily, e.g. from cron: python prune_changes.py
+
+def main():
+    db = SessionLocal()
+    try:
+        deleted = crud.prune_catalog_changes(db, retention_days=settings.CHANGES_RETENTION_DAYS)
+        logger.info(f"Pruned {deleted} change{'' if deleted == 1 else 's'} older than {settings.CHANGES_RETENTION_DAYS} days.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import logging
+
+import crud
+from database import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Repairs drift in categories.piece_count (normally maintained by a trigger on pieces_of_art).
+# Safe to run at any time, e.g. nightly from cron: python reconcile_counts.py
+
+def main():
+    db = SessionLocal()
+    try:
+        repaired = crud.reconcile_category_piece_counts(db)
+        logger.info(f"Reconciled piece counts: {repaired} categor{'y' if repaired == 1 else 'ies'} repaired.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Union
+from pydantic import AliasChoices, BaseModel, EmailStr, Field, create_model, field_validator, model_validator
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Type, Union
 from datetime import datetime
 
 # Base models for common fields
@@ -24,6 +25,13 @@ class Category(CategoryBase, TimeStampedModel):
     class Config:
         from_attributes = True # Changed from orm_mode for Pydantic v2
 
+class CategoryWithCount(Category):
+    piece_count: int
+
+class CategoryDeleted(Category):
+    pieces_reassigned: int = 0 # Moved to the `reassign_to` category
+    pieces_deleted: int = 0 # Deleted with `cascade=true`
+
 # PieceOfArt Schemas
 class PieceOfArtBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -40,13 +48,172 @@ class PieceOfArtUpdate(BaseModel):
     image_url: Optional[str] = Field(None, max_length=1024)
     category_id: Optional[int] = None
 
-class PieceOfArt(PieceOfArtBase, TimeStampedModel):
+    @field_validator("name", "image_url", "category_id")
+    @classmethod
+    def _not_null(cls, value: Any) -> Any:
+        # Omit a field to leave it unchanged; only description can be cleared
+        if value is None:
+            raise ValueError("Cannot be null")
+        return value
+
+# MIME type of each derivative format, as used in <source type="...">
+IMAGE_VARIANT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+def build_srcset(variants: List[Dict[str, Any]]) -> Dict[str, str]:
+    """srcset strings keyed by MIME type from image variant descriptors ({"url", "width", "format", ...})."""
+    srcset: Dict[str, List[str]] = {}
+    for variant in sorted(variants, key=lambda v: v["width"]):
+        mime_type = IMAGE_VARIANT_TYPES.get(variant["format"], f"image/{variant['format']}")
+        srcset.setdefault(mime_type, []).append(f"{variant['url']} {variant['width']}w")
+    return {mime_type: ", ".join(candidates) for mime_type, candidates in srcset.items()}
+
+class ImageSrcsetMixin(BaseModel):
+    # Resized variants of image_url as srcset strings keyed by MIME type, e.g.
+    # {"image/avif": "/media/... 200w, /media/... 400w", "image/webp": "..."}; null until generated.
+    # Built from the model's image_variants column when read from the ORM.
+    image_srcset: Optional[Dict[str, str]] = Field(None, validation_alias=AliasChoices("image_srcset", "image_variants"))
+
+    @field_validator("image_srcset", mode="before")
+    @classmethod
+    def _srcset_from_variants(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return build_srcset(value) or None
+        return value
+
+    class Config:
+        from_attributes = True
+
+class PieceOfArt(ImageSrcsetMixin, PieceOfArtBase, TimeStampedModel):
     id: int
     category: Optional[Category] = None # Include category details when fetching a piece of art
 
     class Config:
         from_attributes = True
 
+class PieceOfArtSummary(ImageSrcsetMixin):
+    """Lightweight projection for grid views (`view=summary`): enough to render a thumbnail."""
+    id: int
+    name: str
+    image_url: str
+
+# Sparse fieldsets (`fields=`): any subset of the PieceOfArt output fields
+PIECE_OF_ART_FIELDS = tuple(PieceOfArt.model_fields)
+PIECE_OF_ART_SUMMARY_FIELDS = frozenset(("id", "name", "image_url", "image_srcset"))
+
+class _FromAttributes(BaseModel):
+    class Config:
+        from_attributes = True
+
+@lru_cache(maxsize=128)
+def piece_of_art_fields_model(fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    A model with only the given PieceOfArt fields, so validating an ORM object reads just
+    those attributes (and never lazy-loads columns left out of the query).
+    """
+    base = ImageSrcsetMixin if "image_srcset" in fields else _FromAttributes
+    definitions = {name: (field.annotation, field) for name, field in PieceOfArt.model_fields.items() if name in fields and name != "image_srcset"}
+    return create_model("PieceOfArtFields", __base__=base, **definitions)
+
+# Batch get
+PIECE_OF_ART_BATCH_MAX_IDS = 500
+
+class PieceOfArtBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=PIECE_OF_ART_BATCH_MAX_IDS)
+
+class PieceOfArtBatch(BaseModel):
+    items: List[PieceOfArt] # In the order the ids were requested
+    missing: List[int] = [] # Requested ids that don't exist
+
+# Bulk update / delete
+PIECE_OF_ART_BULK_MAX_ITEMS = 1000
+
+class PieceOfArtFilter(BaseModel):
+    """Selects pieces by id and/or category; at least one is required (both must match)."""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=PIECE_OF_ART_BULK_MAX_ITEMS)
+    category_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _not_empty(self) -> "PieceOfArtFilter":
+        if self.ids is None and self.category_id is None:
+            raise ValueError("Give ids and/or category_id")
+        return self
+
+class PieceOfArtPatch(PieceOfArtUpdate):
+    id: int
+
+class PieceOfArtBulkUpdate(BaseModel):
+    """
+    Either `filter` with the `changes` to apply to every selected piece, e.g.
+    {"filter": {"category_id": 3}, "changes": {"category_id": 7}}, or a list of per-piece
+    `patches`: {"patches": [{"id": 1, "name": "..."}, {"id": 2, "image_url": "..."}]}.
+    """
+    filter: Optional[PieceOfArtFilter] = None
+    changes: Optional[PieceOfArtUpdate] = None
+    patches: Optional[List[PieceOfArtPatch]] = Field(None, min_length=1, max_length=PIECE_OF_ART_BULK_MAX_ITEMS)
+
+    @model_validator(mode="after")
+    def _one_form(self) -> "PieceOfArtBulkUpdate":
+        if self.patches is not None:
+            if self.filter is not None or self.changes is not None:
+                raise ValueError("Give either patches or filter and changes, not both")
+            if len({patch.id for patch in self.patches}) != len(self.patches):
+                raise ValueError("Each piece can only be patched once per request")
+            empty = [patch.id for patch in self.patches if not patch.model_fields_set - {"id"}]
+            if empty:
+                raise ValueError(f"Empty patches for ids: {', '.join(map(str, empty))}")
+        elif self.filter is None or self.changes is None:
+            raise ValueError("Give filter and changes, or patches")
+        elif not self.changes.model_fields_set:
+            raise ValueError("changes is empty")
+        return self
+
+class PieceOfArtBulkResult(BaseModel):
+    affected: int # Pieces updated or deleted
+    missing: List[int] = [] # Requested ids (filter.ids or patch ids) that matched no piece
+
+# Bulk import of pieces of art (JSON Lines / CSV rows)
+class PieceOfArtImportRow(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    image_url: str = Field(..., max_length=1024)
+    # Either an existing category id or a category name
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+
+class PieceOfArtImportError(BaseModel):
+    line: int # 1-based line (JSONL) or record line (CSV) in the uploaded file
+    error: str
+
+class PieceOfArtImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[PieceOfArtImportError] = []
+    errors_truncated: bool = False # True when more rows failed than are listed in `errors`
+
+# Direct media uploads
+class MediaUpload(BaseModel):
+    url: str # Use as a piece's image_url
+    content_type: str
+    size: int
+    sha256: str
+    deduplicated: bool # True when identical content was already stored
+
+# Changes feed (delta sync)
+class CatalogChange(BaseModel):
+    seq: int = Field(..., validation_alias="id") # Unique id in the change log; pages follow commit order, not seq
+    entity: Literal["category", "piece"]
+    entity_id: int
+    op: Literal["upsert", "delete"] # "delete" entries are tombstones for removed rows
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class CatalogChangesPage(BaseModel):
+    changes: List[CatalogChange]
+    next_cursor: str # Pass as `since` on the next call (also when `changes` is empty)
+    has_more: bool
+
 # Manager Schemas
 class ManagerBase(BaseModel):
     email: EmailStr
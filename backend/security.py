@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Union, Any, Optional
+from typing import Union, Any, Callable, Optional
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -18,6 +21,62 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing pool and its wait queue are full."""
+
+class PasswordHasherPool:
+    """
+    Runs bcrypt work on a dedicated, size-limited executor.
+    At most `workers + max_pending` jobs are admitted at once; beyond that, `run` fails fast
+    with PasswordHasherBusy instead of queueing without bound, so a login burst cannot pile up
+    work that starves the rest of the API.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool = False):
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing this module (e.g. from alembic or the seeding script) doesn't spawn workers
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Free the slot when the job really finishes, even if the awaiting request is cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASHER_EXECUTOR == "process",
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hashing pool. Raises PasswordHasherBusy when saturated."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
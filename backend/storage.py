@@ -0,0 +1,120 @@
+import importlib
+import io
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Optional
+
+from core.config import settings
+
+# Media storage. Keys are relative POSIX paths such as "derivatives/ab/abcd.../400w.webp".
+# The backend is pluggable: MEDIA_STORAGE_BACKEND names a Storage subclass ("module.Class")
+# that can be constructed without arguments.
+
+class Storage(ABC):
+    """Interface for where media files (originals and image derivatives) are kept."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def save_stream(self, key: str, source: BinaryIO) -> None:
+        """
+        Stores the rest of `source` under `key`, replacing any previous content atomically.
+        Implementations copy it in chunks, so files of any size are never held in memory.
+        """
+
+    def save(self, key: str, data: bytes) -> None:
+        """Stores `data` under `key`, replacing any previous content atomically."""
+        self.save_stream(key, io.BytesIO(data))
+
+    def save_file(self, key: str, path: str) -> None:
+        """Moves a local file (e.g. a finished upload) into storage under `key`."""
+        with open(path, "rb") as source:
+            self.save_stream(key, source)
+        os.unlink(path)
+
+    def temp_dir(self) -> Optional[str]:
+        """Where to write files destined for save_file(); None for the system temporary directory."""
+        return None
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL the file is served from."""
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        """The key of a URL produced by `url()`, or None if the URL is not served by this storage."""
+        return None
+
+class LocalStorage(Storage):
+    """Files under MEDIA_ROOT on the local filesystem, served by the API under MEDIA_URL."""
+
+    def __init__(self, root: Optional[str] = None, base_url: Optional[str] = None):
+        self.root = Path(root or settings.MEDIA_ROOT).resolve()
+        self.base_url = (base_url or settings.MEDIA_URL).rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        relative = PurePosixPath(key)
+        if relative.is_absolute() or ".." in relative.parts:
+            raise ValueError(f"Invalid media key: {key}")
+        return self.root.joinpath(*relative.parts)
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def save_stream(self, key: str, source: BinaryIO) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file next to the target and rename, so readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                shutil.copyfileobj(source, tmp)
+            os.chmod(tmp_path, 0o644) # mkstemp creates owner-only files; media is public
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def save_file(self, key: str, path: str) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(path, 0o644)
+        os.replace(path, target) # A rename, as long as `path` came from temp_dir()
+
+    def temp_dir(self) -> Optional[str]:
+        incoming = self.root / ".incoming"
+        incoming.mkdir(exist_ok=True)
+        return str(incoming)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+def _load_backend(dotted_path: str) -> Storage:
+    module_name, _, class_name = dotted_path.rpartition(".")
+    backend = getattr(importlib.import_module(module_name), class_name)
+    return backend()
+
+_storage: Optional[Storage] = None
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        _storage = _load_backend(settings.MEDIA_STORAGE_BACKEND)
+    return _storage
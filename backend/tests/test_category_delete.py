@@ -0,0 +1,72 @@
+"""Deleting a category moves (reassign_to) or deletes (cascade) its pieces in the same transaction."""
+import pytest
+
+import crud
+import models
+import schemas
+
+@pytest.fixture
+def categories(db):
+    paintings = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    drawings = crud.create_category(db, schemas.CategoryCreate(name="Drawings"))
+    pieces = [
+        crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name=f"Piece {index}", image_url="https://example.com/1.jpg", category_id=paintings.id))
+        for index in range(3)
+    ]
+    return paintings.id, drawings.id, sorted(piece.id for piece in pieces)
+
+def _changes_after(client):
+    cursor = client.get("/api/changes/").json()["next_cursor"]
+    return lambda: [(change["entity"], change["entity_id"], change["op"]) for change in client.get("/api/changes/", params={"since": cursor}).json()["changes"]]
+
+def test_reassign(client, db, manager_headers, categories):
+    paintings, drawings, pieces = categories
+    changes = _changes_after(client)
+
+    response = client.delete(f"/api/categories/{paintings}?reassign_to={drawings}", headers=manager_headers)
+    assert response.status_code == 200
+    assert (response.json()["pieces_reassigned"], response.json()["pieces_deleted"]) == (3, 0)
+
+    db.expire_all()
+    assert db.get(models.Category, paintings) is None
+    assert db.get(models.Category, drawings).piece_count == 3
+    assert sorted(piece.id for piece in crud.get_pieces_of_art(db, category_id=drawings)) == pieces
+    # The moved pieces and the deleted category; the target's piece_count isn't synced
+    assert changes() == [("piece", piece_id, "upsert") for piece_id in pieces] + [("category", paintings, "delete")]
+
+def test_cascade(client, db, manager_headers, categories):
+    paintings, drawings, pieces = categories
+    changes = _changes_after(client)
+
+    response = client.delete(f"/api/categories/{paintings}?cascade=true", headers=manager_headers)
+    assert response.status_code == 200
+    assert (response.json()["pieces_reassigned"], response.json()["pieces_deleted"]) == (0, 3)
+
+    assert db.query(models.PieceOfArt).count() == 0
+    assert changes() == [("piece", piece_id, "delete") for piece_id in pieces] + [("category", paintings, "delete")]
+
+@pytest.mark.parametrize("query, status_code", [
+    ("reassign_to={paintings}", 400), # Into itself
+    ("reassign_to=999", 404), # Unknown target
+    ("reassign_to={drawings}&cascade=true", 400),
+])
+def test_invalid_requests_change_nothing(client, db, manager_headers, categories, query, status_code):
+    paintings, drawings, pieces = categories
+    response = client.delete(f"/api/categories/{paintings}?" + query.format(paintings=paintings, drawings=drawings), headers=manager_headers)
+    assert response.status_code == status_code
+
+    db.expire_all()
+    assert db.get(models.Category, paintings).piece_count == 3
+    assert db.get(models.Category, drawings).piece_count == 0
+
+def test_unknown_category_with_reassign(client, manager_headers, categories):
+    _, drawings, _ = categories
+    response = client.delete(f"/api/categories/999?reassign_to={drawings}", headers=manager_headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Category not found"
+
+def test_crud_unknown_reassign_target(db, categories):
+    paintings, _, _ = categories
+    with pytest.raises(crud.ForeignKeyViolation):
+        crud.delete_category(db, paintings, reassign_to=999)
+    assert db.get(models.Category, paintings) is not None
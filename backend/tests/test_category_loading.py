@@ -0,0 +1,55 @@
+"""PIECE_CATEGORY_LOADING: reading and serializing pieces costs the same number of statements for any page size."""
+import pytest
+
+import crud
+import models
+import schemas
+from core.config import settings
+from database import SessionLocal
+
+PAGE_SIZES = (1, 10, 50)
+
+@pytest.fixture
+def pieces(db):
+    # One category per piece, so a lazy load could never be answered from the identity map
+    categories = [models.Category(name=f"Category {index}") for index in range(max(PAGE_SIZES))]
+    db.add_all(categories)
+    db.flush()
+    db.add_all(
+        models.PieceOfArt(name=f"Piece {index}", image_url=f"https://example.com/{index}.jpg", category_id=category.id)
+        for index, category in enumerate(categories)
+    )
+    db.commit()
+
+def _statements_for_page(count_statements, limit: int) -> int:
+    db = SessionLocal() # A fresh session each time: nothing already in the identity map
+    try:
+        with count_statements() as statements:
+            page = crud.get_pieces_of_art(db, limit=limit)
+            assert len(page) == limit
+            for piece in page:
+                schemas.PieceOfArt.model_validate(piece)
+        return statements.count
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("strategy", ["joined", "selectin"])
+def test_list_statement_count_is_constant(pieces, count_statements, monkeypatch, strategy):
+    monkeypatch.setattr(settings, "PIECE_CATEGORY_LOADING", strategy)
+    counts = {limit: _statements_for_page(count_statements, limit) for limit in PAGE_SIZES}
+    assert len(set(counts.values())) == 1, counts
+    assert counts[PAGE_SIZES[0]] == (1 if strategy == "joined" else 2)
+
+def test_lazy_loading_grows_with_the_page(pieces, count_statements, monkeypatch):
+    # The counter itself catches N+1: without eager loading each row costs a SELECT
+    monkeypatch.setattr(settings, "PIECE_CATEGORY_LOADING", "lazy")
+    counts = [_statements_for_page(count_statements, limit) for limit in PAGE_SIZES]
+    assert counts == [1 + limit for limit in PAGE_SIZES]
+
+@pytest.mark.parametrize("strategy", ["joined", "selectin"])
+def test_detail_loads_category_eagerly(pieces, db, count_statements, monkeypatch, strategy):
+    monkeypatch.setattr(settings, "PIECE_CATEGORY_LOADING", strategy)
+    with count_statements() as statements:
+        piece = crud.get_piece_of_art(db, 1)
+        assert schemas.PieceOfArt.model_validate(piece).category.id == piece.category_id
+    assert statements.count == (1 if strategy == "joined" else 2)
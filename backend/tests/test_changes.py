@@ -0,0 +1,101 @@
+"""Changes feed: commit order without serializing writers, export cursors and retention."""
+import pytest
+from sqlalchemy import text
+
+import crud
+import schemas
+from core import pagination
+from database import engine
+
+def _feed(client, since=None, limit=1000):
+    params = {"limit": limit}
+    if since is not None:
+        params["since"] = since
+    return client.get("/api/changes/", params=params)
+
+def _entries(page):
+    return [(change["entity"], change["entity_id"], change["op"]) for change in page["changes"]]
+
+def test_feed_lists_writes_and_tombstones(client, db):
+    category = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    piece = crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name="Sunflowers", image_url="https://example.com/1.jpg", category_id=category.id))
+    first = _feed(client, limit=1).json()
+    assert _entries(first) == [("category", category.id, "upsert")]
+    assert first["has_more"]
+
+    crud.delete_piece_of_art(db, piece.id)
+    rest = _feed(client, since=first["next_cursor"]).json()
+    assert _entries(rest) == [("piece", piece.id, "delete")] # Compacted: the upsert is superseded
+    assert _feed(client, since=rest["next_cursor"]).json()["changes"] == []
+
+def test_piece_writes_do_not_record_category_changes(client, db):
+    paintings = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    drawings = crud.create_category(db, schemas.CategoryCreate(name="Drawings"))
+    cursor = _feed(client).json()["next_cursor"]
+
+    # piece_count of both categories changes, nothing clients sync does
+    piece = crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name="Sunflowers", image_url="https://example.com/1.jpg", category_id=paintings.id))
+    page = _feed(client, since=cursor).json()
+    assert _entries(page) == [("piece", piece.id, "upsert")]
+    crud.update_piece_of_art(db, piece.id, schemas.PieceOfArtUpdate(category_id=drawings.id))
+    crud.delete_piece_of_art(db, piece.id)
+    page = _feed(client, since=page["next_cursor"]).json()
+    assert _entries(page) == [("piece", piece.id, "delete")]
+
+    crud.update_category(db, drawings.id, schemas.CategoryUpdate(name="Sketches"))
+    assert _entries(_feed(client, since=page["next_cursor"]).json()) == [("category", drawings.id, "upsert")]
+
+def test_single_piece_insert_records_one_entry(db):
+    category = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    before = db.execute(text("SELECT count(*) FROM catalog_changes")).scalar_one()
+    crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name="Sunflowers", image_url="https://example.com/1.jpg", category_id=category.id))
+    assert db.execute(text("SELECT count(*) FROM catalog_changes")).scalar_one() == before + 1
+
+def test_concurrent_writers_do_not_wait_and_late_commits_are_not_skipped(client, db):
+    with engine.connect() as slow, engine.connect() as fast:
+        slow.execute(text("INSERT INTO categories (name) VALUES ('Started first')"))
+        # Would block on the slow writer if writers were serialized
+        fast.execute(text("SET lock_timeout = '2s'"))
+        fast.execute(text("INSERT INTO categories (name) VALUES ('Committed first')"))
+        fast.commit()
+
+        # The fast change waits until no earlier transaction can still add changes before it
+        page = _feed(client).json()
+        assert page["changes"] == []
+        slow.commit()
+
+    page = _feed(client, since=page["next_cursor"]).json()
+    names = {category.id: category.name for category in crud.get_categories(db)}
+    assert [names[change["entity_id"]] for change in page["changes"]] == ["Started first", "Committed first"]
+
+def test_export_cursor_follows_changes_after_the_export(client, db):
+    category = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    cursor = client.get("/api/pieces/export").headers["X-Changes-Cursor"]
+    piece = crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name="Sunflowers", image_url="https://example.com/1.jpg", category_id=category.id))
+    assert _entries(_feed(client, since=cursor).json()) == [("piece", piece.id, "upsert")]
+
+def test_cursors_without_txid_start_before_new_changes(client, db):
+    category = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    assert _entries(_feed(client, since=pagination.encode_cursor(0)).json()) == [("category", category.id, "upsert")]
+
+def test_pruned_cursors_are_gone(client, db):
+    old = crud.create_category(db, schemas.CategoryCreate(name="Old"))
+    stale_cursor = _feed(client).json()["next_cursor"]
+    crud.create_category(db, schemas.CategoryCreate(name="Older"))
+    db.execute(text("UPDATE catalog_changes SET changed_at = now() - interval '40 days'"))
+    db.commit()
+    recent = crud.create_category(db, schemas.CategoryCreate(name="Recent"))
+    kept_cursor = _feed(client).json()["next_cursor"]
+
+    assert crud.prune_catalog_changes(db, retention_days=30) == 2
+    assert crud.prune_catalog_changes(db, retention_days=30) == 0
+
+    response = _feed(client, since=stale_cursor)
+    assert response.status_code == 410
+    assert _entries(_feed(client).json()) == [("category", recent.id, "upsert")]
+    assert _feed(client, since=kept_cursor).status_code == 200
+    assert old.id not in [change["entity_id"] for change in _feed(client).json()["changes"]]
+
+@pytest.mark.parametrize("since", ["not-a-cursor", pagination.encode_cursor(1, txid="x")])
+def test_invalid_cursors(client, db, since):
+    assert _feed(client, since=since).status_code == 400
@@ -0,0 +1,62 @@
+"""Compressed responses carry weak ETags and Vary: Accept-Encoding; revalidation still answers 304."""
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+import models
+from core.compression import CompressionMiddleware, accepted_encodings
+
+@pytest.fixture
+def categories(db):
+    # Enough for a listing above RESPONSE_COMPRESSION_MIN_SIZE
+    db.add_all(models.Category(name=f"Category {index}", description="A category of the collection " * 4) for index in range(40))
+    db.commit()
+
+def test_compressed_listing_has_a_weak_etag(client, categories):
+    response = client.get("/api/categories/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith('W/"')
+    assert [value.strip() for value in response.headers["vary"].split(",")].count("Accept-Encoding") == 1
+
+def test_uncompressed_listing_keeps_a_strong_etag(client, categories):
+    response = client.get("/api/categories/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"].startswith('"')
+    assert "Accept-Encoding" in response.headers["vary"]
+
+def test_small_bodies_get_the_same_etag_as_compressed_ones(client, db):
+    db.add(models.Category(name="Paintings"))
+    db.commit()
+    response = client.get("/api/categories/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers # Under the minimum size
+    assert response.headers["etag"].startswith('W/"')
+
+def test_revalidation_with_a_weak_etag(client, categories):
+    etag = client.get("/api/categories/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/api/categories/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert "Accept-Encoding" in response.headers["vary"]
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "gzip;q=0.0, identity", "identity"])
+def test_refused_encodings_are_not_used(client, categories, accept_encoding):
+    response = client.get("/api/categories/", headers={"Accept-Encoding": accept_encoding})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"].startswith('"')
+
+def test_gzip_when_brotli_is_refused(client, categories):
+    response = client.get("/api/categories/", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+@pytest.mark.parametrize("gzip_level, extra_flags", [(1, 4), (9, 2)])
+def test_gzip_level(gzip_level, extra_flags):
+    app = CompressionMiddleware(PlainTextResponse("x" * 2000), minimum_size=500, gzip_level=gzip_level)
+    with TestClient(app).stream("GET", "/", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        body = b"".join(response.iter_raw())
+    assert body[8] == extra_flags # XFL in the gzip header: 4 for the fastest level, 2 for the best
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == ["gzip", "deflate", "br"]
+    assert accepted_encodings("GZIP;q=0.5, br;q=0, *;q=0.000") == ["gzip"]
+    assert accepted_encodings("") == []
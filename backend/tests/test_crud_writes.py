@@ -0,0 +1,132 @@
+"""Catalog and manager writes are one INSERT/UPDATE/DELETE ... RETURNING; constraint errors map to 400/404."""
+import pytest
+
+import crud
+import models
+import schemas
+
+@pytest.fixture
+def category(db):
+    return crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+
+@pytest.fixture
+def piece(db, category):
+    return crud.create_piece_of_art(db, schemas.PieceOfArtCreate(
+        name="Sunflowers", image_url="https://example.com/sunflowers.jpg", category_id=category.id,
+    ))
+
+def _single_write(counter, verb: str) -> None:
+    assert counter.count == 1, counter.statements
+    assert counter.statements[0].lstrip().upper().startswith(verb)
+    assert "RETURNING" in counter.statements[0].upper()
+
+# --- One statement per write ---
+def test_create_category(db, count_statements):
+    with count_statements() as counter:
+        created = crud.create_category(db, schemas.CategoryCreate(name="Sculptures", description="Stone"))
+    _single_write(counter, "INSERT")
+    assert (created.id, created.name, created.description) == (1, "Sculptures", "Stone")
+
+def test_update_category(db, category, count_statements):
+    with count_statements() as counter:
+        updated = crud.update_category(db, category.id, schemas.CategoryUpdate(name="Oil paintings"))
+    _single_write(counter, "UPDATE")
+    assert updated.name == "Oil paintings"
+
+def test_delete_category(db, category, count_statements):
+    with count_statements() as counter:
+        deleted, pieces = crud.delete_category(db, category.id)
+    _single_write(counter, "DELETE")
+    assert (deleted.id, pieces) == (category.id, 0)
+
+def test_create_piece_of_art_returns_its_category(db, category, count_statements):
+    with count_statements() as counter:
+        created = crud.create_piece_of_art(db, schemas.PieceOfArtCreate(
+            name="Water Lilies", image_url="https://example.com/lilies.jpg", category_id=category.id,
+        ))
+        assert schemas.PieceOfArt.model_validate(created).category.name == "Paintings" # No lazy load either
+    _single_write(counter, "WITH")
+
+def test_update_piece_of_art(db, piece, count_statements):
+    with count_statements() as counter:
+        updated = crud.update_piece_of_art(db, piece.id, schemas.PieceOfArtUpdate(name="Sunflowers (1888)"))
+        assert schemas.PieceOfArt.model_validate(updated).name == "Sunflowers (1888)"
+    _single_write(counter, "WITH")
+
+def test_delete_piece_of_art(db, piece, count_statements):
+    with count_statements() as counter:
+        deleted = crud.delete_piece_of_art(db, piece.id)
+        schemas.PieceOfArt.model_validate(deleted)
+    _single_write(counter, "WITH")
+    assert db.query(models.PieceOfArt).count() == 0
+
+def test_manager_writes(db, count_statements):
+    manager_in = schemas.ManagerCreate(email="curator@example.com", first_name="Ada", last_name="Curator", password="correct-horse")
+    with count_statements() as counter:
+        manager = crud.create_manager(db, manager_in)
+    _single_write(counter, "INSERT")
+
+    with count_statements() as counter:
+        crud.update_manager(db, manager.id, schemas.ManagerUpdate(last_name="Keeper"))
+    _single_write(counter, "UPDATE")
+
+    with count_statements() as counter:
+        assert crud.delete_manager(db, manager.id).email == "curator@example.com"
+    _single_write(counter, "DELETE")
+
+def test_missing_rows_cost_one_statement(db, count_statements):
+    with count_statements() as counter:
+        assert crud.update_category(db, 404, schemas.CategoryUpdate(name="Nothing")) is None
+        assert crud.update_piece_of_art(db, 404, schemas.PieceOfArtUpdate(name="Nothing")) is None
+        assert crud.delete_piece_of_art(db, 404) is None
+    assert counter.count == 3, counter.statements
+
+# --- Constraint violations ---
+def test_duplicate_names_raise_unique_violation(db, category):
+    with pytest.raises(crud.UniqueViolation):
+        crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    other = crud.create_category(db, schemas.CategoryCreate(name="Drawings")) # The session is still usable
+    with pytest.raises(crud.UniqueViolation):
+        crud.update_category(db, other.id, schemas.CategoryUpdate(name="Paintings"))
+
+def test_unknown_category_raises_foreign_key_violation(db, piece):
+    with pytest.raises(crud.ForeignKeyViolation):
+        crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name="Lost", image_url="https://example.com/x.jpg", category_id=999))
+    with pytest.raises(crud.ForeignKeyViolation):
+        crud.update_piece_of_art(db, piece.id, schemas.PieceOfArtUpdate(category_id=999))
+
+def test_api_maps_unique_violation_to_400(client, manager_headers, category):
+    response = client.post("/api/categories/", json={"name": "Paintings"}, headers=manager_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "A category with this name already exists."
+
+    other = client.post("/api/categories/", json={"name": "Drawings"}, headers=manager_headers).json()
+    response = client.put(f"/api/categories/{other['id']}", json={"name": "Paintings"}, headers=manager_headers)
+    assert response.status_code == 400
+
+def test_api_maps_foreign_key_violation_to_404(client, manager_headers, piece):
+    response = client.post("/api/pieces/", json={"name": "Lost", "image_url": "https://example.com/x.jpg", "category_id": 999}, headers=manager_headers)
+    assert response.status_code == 404
+    response = client.put(f"/api/pieces/{piece.id}", json={"category_id": 999}, headers=manager_headers)
+    assert response.status_code == 404
+
+def test_api_refuses_to_delete_a_category_with_pieces(client, manager_headers, piece):
+    response = client.delete(f"/api/categories/{piece.category_id}", headers=manager_headers)
+    assert response.status_code == 400
+    response = client.delete(f"/api/categories/{piece.category_id}?reassign_to=999", headers=manager_headers)
+    assert response.status_code == 404
+
+@pytest.mark.parametrize("field", ["name", "image_url", "category_id"])
+def test_api_rejects_null_for_required_columns(client, db, manager_headers, piece, field):
+    response = client.put(f"/api/pieces/{piece.id}", json={field: None}, headers=manager_headers)
+    assert response.status_code == 422
+    response = client.post("/api/pieces/bulk-update", json={"patches": [{"id": piece.id, field: None}]}, headers=manager_headers)
+    assert response.status_code == 422
+    response = client.post("/api/pieces/bulk-update", json={"filter": {"ids": [piece.id]}, "changes": {field: None}}, headers=manager_headers)
+    assert response.status_code == 422
+
+def test_api_clears_description_with_null(client, manager_headers, piece):
+    client.put(f"/api/pieces/{piece.id}", json={"description": "A vase of flowers"}, headers=manager_headers)
+    response = client.put(f"/api/pieces/{piece.id}", json={"description": None}, headers=manager_headers)
+    assert response.status_code == 200
+    assert response.json()["description"] is None
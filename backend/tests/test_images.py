@@ -0,0 +1,59 @@
+import http.server
+import threading
+
+import pytest
+
+import images
+from storage import LocalStorage, Storage
+
+@pytest.fixture
+def local_server():
+    """An HTTP server on the loopback interface, as an internal service would be."""
+    server = http.server.HTTPServer(("127.0.0.1", 0), http.server.SimpleHTTPRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize("url", ["file:///etc/passwd", "ftp://example.com/image.jpg", "data:image/png;base64,AAAA"])
+def test_fetch_source_rejects_other_schemes(url):
+    with pytest.raises(ValueError, match="scheme"):
+        images.fetch_source(url)
+
+def test_fetch_source_rejects_loopback(local_server):
+    with pytest.raises(ValueError, match="non-public address 127.0.0.1"):
+        images.fetch_source(f"{local_server}/image.jpg")
+
+def test_fetch_source_rejects_hostnames_resolving_to_private_addresses(monkeypatch):
+    monkeypatch.setattr(images.socket, "getaddrinfo", lambda host, port, **kwargs: [
+        (images.socket.AF_INET, images.socket.SOCK_STREAM, 6, "", ("93.184.215.14", port)),
+        (images.socket.AF_INET, images.socket.SOCK_STREAM, 6, "", ("169.254.169.254", port)),
+    ])
+    with pytest.raises(ValueError, match="non-public address 169.254.169.254"):
+        images.fetch_source("http://images.example.com/image.jpg")
+
+@pytest.mark.parametrize("address", ["10.0.0.5", "192.168.1.1", "::1", "::ffff:127.0.0.1", "fd00::1"])
+def test_public_address_rejects_private_ranges(monkeypatch, address):
+    family = images.socket.AF_INET6 if ":" in address else images.socket.AF_INET
+    monkeypatch.setattr(images.socket, "getaddrinfo", lambda host, port, **kwargs: [(family, images.socket.SOCK_STREAM, 6, "", (address, port))])
+    with pytest.raises(ValueError):
+        images._public_address("internal.example.com", 80)
+
+def test_storage_backends_must_implement_the_interface():
+    class Incomplete(Storage):
+        def exists(self, key):
+            return False
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_save_file_streams_into_storage(tmp_path):
+    storage = LocalStorage(str(tmp_path / "media"), "/media")
+    upload = tmp_path / "upload.bin"
+    upload.write_bytes(b"x" * 300_000)
+
+    Storage.save_file(storage, "originals/upload.bin", str(upload)) # The generic, copying implementation
+    assert not upload.exists()
+    with storage.open("originals/upload.bin") as stored:
+        assert stored.read() == b"x" * 300_000
@@ -0,0 +1,42 @@
+import asyncio
+import io
+
+import pytest
+
+import importer
+import models
+
+CSV = b"""name,description,image_url,category_name
+Sunflowers,,https://example.com/1.jpg,Paintings
+Untitled,,https://example.com/2.jpg,Unknown
+Water Lilies,Pond,https://example.com/3.jpg,Paintings
+Haystacks,,https://example.com/4.jpg,Paintings
+"""
+
+@pytest.fixture
+def paintings(db):
+    db.add(models.Category(name="Paintings"))
+    db.commit()
+
+def test_import_file_async_reports_rows(db, paintings):
+    result = asyncio.run(importer.import_file_async(db, io.BytesIO(CSV), "csv", batch_size=2))
+    assert result.created == 3
+    assert [(error.line, error.error) for error in result.errors] == [(3, "Category 'Unknown' not found")]
+    assert db.query(models.PieceOfArt).count() == 3
+
+def test_import_file_async_parses_off_the_event_loop(db, paintings, monkeypatch):
+    on_event_loop = []
+    iter_rows = importer.iter_rows
+
+    def recording_iter_rows(stream, fmt):
+        for item in iter_rows(stream, fmt):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            yield item
+
+    monkeypatch.setattr(importer, "iter_rows", recording_iter_rows)
+    asyncio.run(importer.import_file_async(db, io.BytesIO(CSV), "csv", batch_size=2))
+    assert on_event_loop == [False] * 4
@@ -0,0 +1,81 @@
+"""Range requests on media files: parse_range edge cases and 206/416/If-Range through MediaFiles."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from media_files import MediaFiles, parse_range
+from storage import LocalStorage
+
+@pytest.mark.parametrize("header, size, expected", [
+    ("bytes=0-99", 1000, (0, 99)),
+    ("bytes=900-", 1000, (900, 999)),
+    ("bytes=900-5000", 1000, (900, 999)), # Clamped to the file
+    ("bytes=-100", 1000, (900, 999)),
+    ("bytes=-5000", 1000, (0, 999)), # Suffix longer than the file: all of it
+    ("bytes=0-0", 1, (0, 0)),
+    (" bytes=10-20 ", 1000, (10, 20)),
+])
+def test_parse_range(header, size, expected):
+    assert parse_range(header, size) == expected
+
+@pytest.mark.parametrize("header", ["bytes=-", "bytes=5-3", "bytes=0-9,20-29", "items=0-9", "bytes=a-b"])
+def test_parse_range_ignores_invalid_and_multi_range_headers(header):
+    assert parse_range(header, 1000) is None
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=0-", 0),
+    ("bytes=-100", 0), # Nothing to take the last bytes of
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+CONTENT = bytes(range(256)) * 40
+
+@pytest.fixture
+def media(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/media")
+    (tmp_path / "scans").mkdir()
+    (tmp_path / "scans" / "scan.tif").write_bytes(CONTENT)
+    (tmp_path / "scans" / "empty.tif").write_bytes(b"")
+    app = FastAPI()
+    app.mount("/media", MediaFiles(storage))
+    return TestClient(app)
+
+def test_range_request(media):
+    response = media.get("/media/scans/scan.tif", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert response.headers["content-length"] == "100"
+
+    response = media.get("/media/scans/scan.tif", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-10:]
+
+def test_unsatisfiable_range(media):
+    response = media.get("/media/scans/scan.tif", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    response = media.get("/media/scans/empty.tif", headers={"Range": "bytes=-100"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+
+def test_if_range(media):
+    full = media.get("/media/scans/scan.tif")
+    assert full.status_code == 200
+    assert full.content == CONTENT
+
+    # Current validators: the range is sent
+    for validator in (full.headers["etag"], full.headers["last-modified"]):
+        response = media.get("/media/scans/scan.tif", headers={"Range": "bytes=0-9", "If-Range": validator})
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
+
+    # Stale copy: the whole file is sent instead
+    response = media.get("/media/scans/scan.tif", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
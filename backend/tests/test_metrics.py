@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+def test_metrics_require_a_token(client):
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+def test_metrics_for_a_manager(client, manager_headers):
+    client.get("/api/healthcheck")
+    response = client.get("/api/metrics", headers=manager_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/healthcheck",status="200"}' in response.text
+    assert 'db_pool_connections{state="checked_out"}' in response.text
+
+def test_metrics_for_the_scraper_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    response = client.get("/api/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "db_query_duration_seconds_bucket" in response.text
+
+WORKER = """
+import instrumentation
+instrumentation.http_request_duration_seconds.labels("GET", "/api/pieces/", "200").observe(0.01)
+"""
+SCRAPE = """
+from core.metrics import render_latest
+print(render_latest().decode())
+"""
+
+def test_multiprocess_metrics_sum_over_workers(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+
+    def run(code: str) -> str:
+        return subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+
+    run(WORKER)
+    run(WORKER)
+    exposition = run(SCRAPE)
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/pieces/",status="200"} 2.0' in exposition
+
+@pytest.mark.parametrize("header", ["Basic c2NyYXBlOnNlY3JldA==", "Bearer "])
+def test_metrics_reject_malformed_credentials(client, monkeypatch, header):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/api/metrics", headers={"Authorization": header}).status_code == 401
@@ -0,0 +1,17 @@
+"""Operational endpoints expose internals (cache hit rates, pool state), so only managers may read them."""
+
+def test_cache_stats_requires_a_manager(client):
+    assert client.get("/api/cache/stats").status_code == 401
+
+def test_cache_stats_for_a_manager(client, manager_headers):
+    response = client.get("/api/cache/stats", headers=manager_headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"responses", "managers"}
+
+def test_pool_stats_require_a_manager(client):
+    assert client.get("/api/db/pool").status_code == 401
+
+def test_pool_stats_for_a_manager(client, manager_headers):
+    response = client.get("/api/db/pool", headers=manager_headers)
+    assert response.status_code == 200
+    assert response.json()["pool_size"] >= 1
@@ -0,0 +1,61 @@
+"""categories.piece_count is maintained by a trigger on pieces_of_art, for single and bulk writes."""
+import pytest
+
+import crud
+import models
+import schemas
+
+@pytest.fixture
+def categories(db):
+    paintings = crud.create_category(db, schemas.CategoryCreate(name="Paintings"))
+    drawings = crud.create_category(db, schemas.CategoryCreate(name="Drawings"))
+    return paintings.id, drawings.id
+
+def _counts(db):
+    db.expire_all()
+    return {category.id: category.piece_count for category in db.query(models.Category)}
+
+def _create(db, category_id, name="Piece"):
+    return crud.create_piece_of_art(db, schemas.PieceOfArtCreate(name=name, image_url="https://example.com/1.jpg", category_id=category_id))
+
+def test_insert_move_delete(db, categories):
+    paintings, drawings = categories
+    piece = _create(db, paintings)
+    _create(db, paintings)
+    assert _counts(db) == {paintings: 2, drawings: 0}
+
+    crud.update_piece_of_art(db, piece.id, schemas.PieceOfArtUpdate(category_id=drawings))
+    assert _counts(db) == {paintings: 1, drawings: 1}
+
+    crud.update_piece_of_art(db, piece.id, schemas.PieceOfArtUpdate(name="Renamed")) # Not a move
+    assert _counts(db) == {paintings: 1, drawings: 1}
+
+    crud.delete_piece_of_art(db, piece.id)
+    assert _counts(db) == {paintings: 1, drawings: 0}
+
+def test_bulk_writes(db, categories):
+    paintings, drawings = categories
+    crud.bulk_create_pieces_of_art(db, [
+        {"name": f"Piece {index}", "image_url": "https://example.com/1.jpg", "category_id": (paintings, drawings)[index % 2]}
+        for index in range(10)
+    ])
+    assert _counts(db) == {paintings: 5, drawings: 5}
+
+    # Moves in both directions within one statement: the first pieces alternate paintings, drawings, paintings
+    first = [piece.id for piece in db.query(models.PieceOfArt).order_by(models.PieceOfArt.id).limit(3)]
+    crud.bulk_patch_pieces_of_art(db, [
+        {"id": first[0], "category_id": drawings}, {"id": first[1], "category_id": paintings}, {"id": first[2], "category_id": drawings},
+    ])
+    assert _counts(db) == {paintings: 4, drawings: 6}
+
+    crud.bulk_update_pieces_of_art(db, {"category_id": drawings}, category_id=paintings)
+    assert _counts(db) == {paintings: 0, drawings: 10}
+
+    crud.bulk_delete_pieces_of_art(db, category_id=drawings)
+    assert _counts(db) == {paintings: 0, drawings: 0}
+
+def test_counts_match_reconciliation(db, categories):
+    paintings, drawings = categories
+    for index in range(3):
+        _create(db, (paintings, drawings)[index % 2])
+    assert crud.reconcile_category_piece_counts(db) == 0 # Nothing drifted
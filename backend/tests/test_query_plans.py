@@ -0,0 +1,86 @@
+"""
+Query-plan regression test for the catalog read paths in crud.py. Each check runs a read
+function, captures the SQL it emits and EXPLAINs it with enable_seqscan off: the planner then
+only picks a sequential scan when no index can serve the query, so any Seq Scan left in a plan
+fails the test, whatever the size of the test tables.
+"""
+import json
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import crud
+import models
+
+@pytest.fixture
+def sample(db) -> Dict[str, Any]:
+    """Ids/values that exist in the database, used as query parameters."""
+    categories = [models.Category(name=f"Category {index}") for index in range(3)]
+    db.add_all(categories)
+    db.flush()
+    pieces = [
+        models.PieceOfArt(
+            name=f"Sunset painting {index}", description="Oil on canvas",
+            image_url=f"https://example.com/{index}.jpg", category_id=categories[index % 3].id,
+        )
+        for index in range(30)
+    ]
+    db.add_all(pieces)
+    db.add(models.Manager(email="admin@museum.com", first_name="Ada", last_name="Admin", hashed_password="x"))
+    db.commit()
+    return {"piece_id": pieces[-1].id, "category_id": categories[0].id, "manager_email": "admin@museum.com"}
+
+# (name, callable(db, sample)) pairs; add new crud read paths here
+CHECKS: List[Tuple[str, Callable[[Session, Dict[str, Any]], Any]]] = [
+    ("get_category", lambda db, s: crud.get_category(db, s["category_id"])),
+    ("get_categories", lambda db, s: crud.get_categories(db, limit=100)),
+    ("get_categories (cursor)", lambda db, s: crud.get_categories(db, limit=100, after_id=s["category_id"])),
+    ("get_piece_of_art", lambda db, s: crud.get_piece_of_art(db, s["piece_id"])),
+    ("get_pieces_of_art", lambda db, s: crud.get_pieces_of_art(db, limit=100)),
+    ("get_pieces_of_art (category)", lambda db, s: crud.get_pieces_of_art(db, limit=100, category_id=s["category_id"])),
+    ("get_pieces_of_art (cursor)", lambda db, s: crud.get_pieces_of_art(db, limit=100, after_id=s["piece_id"] // 2)),
+    ("get_pieces_of_art (category, cursor)", lambda db, s: crud.get_pieces_of_art(db, limit=100, category_id=s["category_id"], after_id=s["piece_id"] // 2)),
+    ("get_pieces_of_art_stats (category)", lambda db, s: crud.get_pieces_of_art_stats(db, category_id=s["category_id"])),
+    ("search_pieces_of_art (full text)", lambda db, s: crud.search_pieces_of_art(db, "sunset painting", limit=50)),
+    ("search_pieces_of_art (trigram)", lambda db, s: crud.search_pieces_of_art(db, "sun", limit=50)),
+    ("get_manager_by_email", lambda db, s: crud.get_manager_by_email(db, s["manager_email"])),
+    ("get_catalog_changes", lambda db, s: crud.get_catalog_changes(db, after=(0, 10), limit=100)),
+    # What the FK check does when a category is deleted
+    ("category FK check", lambda db, s: db.execute(
+        text("SELECT 1 FROM pieces_of_art WHERE category_id = :category_id FOR KEY SHARE"), {"category_id": s["category_id"]}
+    ).all()),
+]
+
+# Scans a check may keep: the collection validators take the last change over all categories,
+# which stay few
+ALLOWED_SEQ_SCANS = {"get_pieces_of_art_stats (category)": {"categories"}}
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+def _explain(db: Session, statement: str, parameters: Any) -> Dict[str, Any]:
+    result = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+@pytest.mark.parametrize("name, check", CHECKS, ids=[name for name, _ in CHECKS])
+def test_read_path_uses_indexes(db, sample, count_statements, name, check):
+    with count_statements() as statements:
+        check(db, sample)
+    selects = [(statement, parameters) for statement, parameters in statements.executed if statement.lstrip().upper().startswith("SELECT")]
+    assert selects, f"{name} ran no SELECT"
+
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    for statement, parameters in selects:
+        plan = _explain(db, statement, parameters)
+        scans = [
+            node["Relation Name"] for node in _walk(plan)
+            if node["Node Type"] == "Seq Scan" and node["Relation Name"] not in ALLOWED_SEQ_SCANS.get(name, ())
+        ]
+        assert not scans, f"{name}: sequential scan on {', '.join(scans)}\n{statement}"
+    db.rollback()
@@ -0,0 +1,210 @@
+"""
+Direct image uploads into media storage.
+
+The multipart body is parsed incrementally as it arrives and the file part is written to a
+temporary file in fixed-size chunks while it is hashed, so memory use per upload stays at about
+UPLOAD_CHUNK_SIZE whatever the file size (Starlette's form parsing would spool the whole file
+first and then have it copied again). The finished file is stored under its SHA-256
+(originals/ab/abcdef....tiff): uploading the same image twice stores it once.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+import schemas
+from core.config import settings
+from storage import Storage, get_storage
+
+UPLOAD_FIELD = "file"
+
+# Leading bytes identifying the accepted image types: (signature, content type, extension)
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+    (b"II*\x00", "image/tiff", "tiff"),
+    (b"MM\x00*", "image/tiff", "tiff"),
+]
+SNIFF_BYTES = 12
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """(content type, extension) of an image from its first bytes; None if not a supported image."""
+    for signature, content_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif", "avif"
+    return None
+
+def original_key(digest: str, extension: str) -> str:
+    return f"originals/{digest[:2]}/{digest}.{extension}"
+
+class _FilePartParser:
+    """
+    Incremental multipart/form-data parser that yields the data of one file field.
+    Other fields are ignored; feed() returns the file bytes found in each received chunk.
+    """
+
+    def __init__(self, boundary: bytes, field_name: str):
+        self.field_name = field_name
+        self.found = False # A file part with the expected name has started
+        self.finished = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._data: List[bytes] = []
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self._parser.write(chunk)
+        data, self._data = self._data, []
+        return data
+
+    def close(self) -> List[bytes]:
+        self._parser.finalize()
+        data, self._data = self._data, []
+        return data
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_file = (
+            not self.found
+            and options.get(b"name", b"").decode("latin-1") == self.field_name
+            and b"filename" in options
+        )
+        self.found = self.found or self._in_file
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self.finished = True
+
+class _HashingTempFile:
+    """Temporary file in the storage's temp dir that hashes and size-checks what is written."""
+
+    def __init__(self, storage: Storage, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        fd, self.path = tempfile.mkstemp(dir=storage.temp_dir(), prefix="upload-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise OverflowError
+        self.sha256.update(data)
+        self._file.write(data)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the upload limit of {max_bytes} bytes."
+    )
+
+async def store_upload(request: Request, field_name: str = UPLOAD_FIELD, max_bytes: Optional[int] = None) -> schemas.MediaUpload:
+    """
+    Streams the `field_name` file of a multipart/form-data request into media storage.
+    Rejects bodies over `max_bytes` (413), non-multipart requests (400) and files that are not
+    JPEG, PNG, GIF, TIFF, WebP or AVIF images (415).
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data body.")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024: # Room for the multipart framing
+        raise _too_large(max_bytes)
+
+    storage = get_storage()
+    parser = _FilePartParser(options[b"boundary"], field_name)
+    target = await run_in_threadpool(_HashingTempFile, storage, max_bytes)
+    buffer = bytearray()
+    image_type = None
+    try:
+        async for chunk in request.stream():
+            for data in parser.feed(chunk) if chunk else parser.close():
+                buffer += data
+            if image_type is None and len(buffer) >= SNIFF_BYTES:
+                image_type = sniff_image_type(bytes(buffer[:SNIFF_BYTES]))
+                if image_type is None:
+                    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image type.")
+            if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                await run_in_threadpool(target.write, bytes(buffer))
+                buffer.clear()
+            if parser.finished:
+                break # Ignore anything after the file part
+        if not parser.finished:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing or incomplete file field '{field_name}'."
+            )
+        image_type = image_type or sniff_image_type(bytes(buffer[:SNIFF_BYTES]))
+        if image_type is None:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image type.")
+        await run_in_threadpool(target.write, bytes(buffer))
+        await run_in_threadpool(target.close)
+    except OverflowError:
+        await run_in_threadpool(target.discard)
+        raise _too_large(max_bytes)
+    except BaseException: # Includes client disconnects
+        await run_in_threadpool(target.discard)
+        raise
+
+    content_type, extension = image_type
+    digest = target.sha256.hexdigest()
+    key = original_key(digest, extension)
+    deduplicated = await run_in_threadpool(storage.exists, key)
+    if deduplicated:
+        await run_in_threadpool(target.discard)
+    else:
+        await run_in_threadpool(storage.save_file, key, target.path)
+    return schemas.MediaUpload(
+        url=storage.url(key),
+        content_type=content_type,
+        size=target.size,
+        sha256=digest,
+        deduplicated=deduplicated,
+    )